@@ -4,6 +4,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, status
 from pydantic import Field
 
+from app.dependencies.geometry import GeometryOptionsDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.users import User
@@ -23,14 +24,17 @@ router = APIRouter(prefix="/company", tags=["Company"])
 async def get_status_projects(
     uow: UOWDep, 
     company_id: uuid.UUID,
+    geometry: GeometryOptionsDep,
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SCompanyProjectStatuses]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
     **Получить статус проектов в компании**
     
     `company_id` - id компании у которой получаем проекты
-    """
-    return await CompanyService().get_status_projects(uow, company_id, user), 200
+    
+    `format` - _coords_ (по умолчанию) или _geojson_, `simplify` - допуск упрощения контура, `precision` - точность GeoJSON
+    """ #noqa
+    return await CompanyService().get_status_projects(uow, company_id, user, geometry), 200
 
 @router.get(
     "/current", 
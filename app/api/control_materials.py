@@ -7,6 +7,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from pydantic import Field, ValidationError
 
+from app.dependencies.pagination import PaginationDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.users import User
@@ -70,12 +71,13 @@ async def create_material(
 async def list_work(
     uow: UOWDep,
     object_id: uuid.UUID,
+    pagination: PaginationDep,
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SMaterialsWorkRead]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
     **Получить все ходы работ объекта**
     """
-    return await MaterialService().list_work(uow, object_id), 200
+    return await MaterialService().list_work(uow, object_id, pagination.limit, pagination.cursor), 200
 
 @router.get(
     "/list/{stage_progress_work_id}", 
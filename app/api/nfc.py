@@ -1,9 +1,11 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from pydantic import Field
 
+from app.config.main import settings
+from app.dependencies.pagination import PaginationDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.users import User
@@ -16,6 +18,8 @@ from app.schemas.nfc import (
     SNFCHistoryObject,
     SNFCHistoryObjectList,
     SNFCSessionTerminate,
+    SNFCSync,
+    SNFCSyncResult,
     SNFCVerify,
 )
 from app.services.nfc import NFCService
@@ -77,6 +81,28 @@ async def verify_nfc(
     return await NFCService().verify_nfc(uow, user_data, user, object_id), 201
 
 
+@router.post("/sync", summary="Синхронизация офлайн-сканирований nfc", status_code=status.HTTP_200_OK)
+@api_exception_handler
+async def sync_nfc(
+    uow: UOWDep,
+    user_data: SNFCSync,
+    user: User = Depends(get_current_user)
+) -> Annotated[SuccessResponseModel[SNFCSyncResult] | ErrorEnvelopeModel, Field(discriminator="status")]:
+    """
+    **Синхронизация офлайн-сканирований nfc**
+    
+    `scans` - сканирования, накопленные устройством без сети: `id` генерирует устройство,
+    повторная отправка того же скана не создает дубль (попадает в `duplicates`). Ключ скана - `id`:
+    повтор с другим `scanned_at` (например, после коррекции часов) тоже дубль, если первая отправка
+    была не раньше `NFC_SYNC_MAX_AGE_DAYS` дней назад
+    
+    `rejected` - сканы с неизвестной меткой, меткой другого объекта или временем вне допустимого окна
+    
+    `access` - итоговый срок доступа по объектам, где он был продлен
+    """
+    return await NFCService().sync_nfc(uow, user_data, user), 200
+
+
 @router.get(
     "/history/{object_id}", 
     summary="Получить историю верификаций nfc конкретного объекта", 
@@ -86,26 +112,48 @@ async def verify_nfc(
 async def history_nfc(
     uow: UOWDep, 
     object_id: uuid.UUID,
+    pagination: PaginationDep,
+    days: int = Query(
+        settings.NFC_HISTORY_DEFAULT_DAYS,
+        ge=1,
+        le=settings.NFC_HISTORY_MAX_DAYS,
+        description="Сколько календарных дней максимум на странице",
+    ),
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SNFCHistoryObject]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
     **Получить историю верификаций nfc конкретного объекта**
     
     `object_id` - id объекта у которого получаем историю верификаций
+    
+    `limit` - максимум сканирований на странице
+
+    `days` - максимум календарных дней на странице (от дня первого сканирования страницы)
     """
-    return await NFCService().history_nfc(uow, object_id, user), 200
+    return await NFCService().history_nfc(uow, user, pagination.limit, days, pagination.cursor, object_id), 200
 
 
 @router.get("/history", summary="Получить всю историю верификаций nfc", status_code=status.HTTP_200_OK)
 @api_exception_handler
 async def history_nfc_all(
     uow: UOWDep, 
+    pagination: PaginationDep,
+    days: int = Query(
+        settings.NFC_HISTORY_DEFAULT_DAYS,
+        ge=1,
+        le=settings.NFC_HISTORY_MAX_DAYS,
+        description="Сколько календарных дней максимум на странице",
+    ),
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SNFCHistoryObject]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
     **Получить всю историю верификаций nfc**
+    
+    `limit` - максимум сканирований на странице
+
+    `days` - максимум календарных дней на странице (от дня первого сканирования страницы)
     """
-    return await NFCService().history_nfc_all(uow, user), 200
+    return await NFCService().history_nfc(uow, user, pagination.limit, days, pagination.cursor), 200
 
 @router.post("/session/{object_id}", summary="Завершить сессию nfc", status_code=status.HTTP_200_OK)
 @api_exception_handler
@@ -1,9 +1,11 @@
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Header, UploadFile, status
+from fastapi import APIRouter, Depends, File, Header, Path, Query, Response, UploadFile, status
 from pydantic import Field
 
+from app.dependencies.geometry import BBoxDep, GeometryOptionsDep
+from app.dependencies.pagination import PaginationDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.enums import ActObjectsActionEnum, ChecklistObjectsActionEnum, ObjectTypeEnum, ObjectTypeFilter
@@ -17,10 +19,13 @@ from app.schemas.objects import (
     SCheckListSuccessCreated,
     SCountObjects,
     SObject,
+    SObjectByPoint,
     SObjectCreate,
     SObjectDetail,
     SObjectGEOCheck,
+    SObjectsCounters,
     SObjectsList,
+    SObjectsViewport,
     SObjectUpdated,
 )
 from app.services.objects import ObjectsService
@@ -74,14 +79,17 @@ async def create(
 async def get_object_detail(
     uow: UOWDep, 
     object_id: uuid.UUID,
+    geometry: GeometryOptionsDep,
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[SObjectDetail] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
     **Получить конкретный объект**
     
     `object_id` - id получаемого объекта
-    """
-    return await ObjectsService().get_object_detail(uow, object_id), 200
+    
+    `format` - _coords_ (по умолчанию) или _geojson_, `simplify` - допуск упрощения контура, `precision` - точность GeoJSON
+    """ #noqa
+    return await ObjectsService().get_object_detail(uow, object_id, geometry), 200
 
 @router.get(
     "/count/{filter_by}/{company_id}", 
@@ -105,6 +113,25 @@ async def count_objects(
     """ #noqa
     return await ObjectsService().count_objects(uow, category_id, filter_by, company_id, user), 200
 
+@router.get(
+    "/counters/{company_id}", 
+    summary="Получить количество объектов по всем вкладкам", 
+    status_code=status.HTTP_200_OK
+    )
+@api_exception_handler
+async def objects_counters(
+    uow: UOWDep, 
+    company_id: uuid.UUID,
+    category_id: uuid.UUID | None = None,
+    user: User = Depends(get_current_user)
+) -> Annotated[SuccessResponseModel[SObjectsCounters] | ErrorEnvelopeModel, Field(discriminator="status")]:
+    """
+    **Получить количество объектов по всем вкладкам**
+    
+    `category_id` - id категории, null - все категории
+    """
+    return await ObjectsService().objects_counters(uow, category_id, company_id, user), 200
+
 @router.get(
     "/categories", 
     summary="Получить все категории объектов", 
@@ -120,6 +147,56 @@ async def get_all_categories_objects(
     """
     return await ObjectsService().get_all_categories_objects(uow), 200
 
+@router.get(
+    "/viewport/{company_id}", 
+    summary="Получить объекты в видимой области карты", 
+    status_code=status.HTTP_200_OK
+    )
+@api_exception_handler
+async def viewport(
+    uow: UOWDep, 
+    company_id: uuid.UUID,
+    bbox: BBoxDep,
+    geometry: GeometryOptionsDep,
+    zoom: int | None = Query(None, ge=0, le=22, description="Масштаб карты"),
+    user: User = Depends(get_current_user)
+) -> Annotated[SuccessResponseModel[SObjectsViewport] | ErrorEnvelopeModel, Field(discriminator="status")]:
+    """
+    **Получить объекты в видимой области карты**
+    
+    `company_id` - id компании
+    
+    `min_lon`, `min_lat`, `max_lon`, `max_lat` - границы видимой области
+    
+    `zoom` - при малом масштабе вместо объектов возвращаются `clusters` - количество объектов по ячейкам сетки
+    """ #noqa
+    return await ObjectsService().viewport(uow, company_id, user, bbox, zoom, geometry), 200
+
+@router.get(
+    "/tiles/{z}/{x}/{y}.mvt", 
+    summary="Получить векторный тайл объектов", 
+    status_code=status.HTTP_200_OK,
+    response_class=Response
+    )
+async def get_tile(
+    uow: UOWDep, 
+    z: int = Path(..., ge=0, le=22),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    if_none_match: str | None = Header(None),
+    user: User = Depends(get_current_user)
+) -> Response:
+    """
+    **Получить векторный тайл объектов (Mapbox Vector Tile)**
+    
+    Слой `objects` с атрибутами `id`, `title`, `status`. Поддерживается `If-None-Match`
+    """
+    etag, tile = await ObjectsService().get_tile(uow, z, x, y, user)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
+
 @router.get(
     "/all/{filter_by}/{company_id}", 
     summary="Получить все объекты по фильтру", 
@@ -130,6 +207,7 @@ async def get_all_objects_by_filter(
     uow: UOWDep, 
     filter_by: ObjectTypeFilter,
     company_id: uuid.UUID,
+    pagination: PaginationDep,
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SObjectsList]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
@@ -137,7 +215,9 @@ async def get_all_objects_by_filter(
     
     `filter_by` - _all_ - получаем все, _active_ - активные, _not_active_ - неактивные, _agreement_ - на согласовании, _act_opening_ - требуется акт открытия
     """ #noqa
-    return await ObjectsService().get_all_objects_by_filter(uow, filter_by, company_id, user), 200
+    return await ObjectsService().get_all_objects_by_filter(
+        uow, filter_by, company_id, user, pagination.limit, pagination.cursor
+    ), 200
 
 @router.post(
     "/send/file/{object_id}", 
@@ -275,4 +355,29 @@ async def check_geo(
         object_id, 
         latitude,
         longitude
-        ), 200
\ No newline at end of file
+        ), 200
+
+
+@router.get(
+    "/geo/contains/{company_id}", 
+    summary="Найти объекты по точке", 
+    status_code=status.HTTP_200_OK
+    )
+@api_exception_handler
+async def find_by_point(
+    uow: UOWDep, 
+    company_id: uuid.UUID,
+    latitude: float = Header(..., description="Широта"),
+    longitude: float = Header(..., description="Долгота"), 
+    user: User = Depends(get_current_user)
+) -> Annotated[SuccessResponseModel[list[SObjectByPoint]] | ErrorEnvelopeModel, Field(discriminator="status")]:
+    """
+    **Найти объекты, в контуре которых находится пользователь**
+    
+    `company_id` - id компании
+    
+    `latitude` - широта
+    
+    `longitude` - долгота
+    """
+    return await ObjectsService().find_by_point(uow, company_id, user, latitude, longitude), 200
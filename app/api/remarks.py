@@ -7,6 +7,7 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from pydantic import Field, ValidationError
 
+from app.dependencies.pagination import PaginationDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.users import User
@@ -99,6 +100,7 @@ async def create_remark(
 async def get_all_remarks(
     uow: UOWDep, 
     object_id: uuid.UUID,
+    pagination: PaginationDep,
     user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SRemarksList]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """
@@ -106,7 +108,7 @@ async def get_all_remarks(
     
     `object_id` - id объекта для которого получаем замечания
     """
-    return await RemarksService().get_all_remarks(uow, object_id), 200
+    return await RemarksService().get_all_remarks(uow, object_id, pagination.limit, pagination.cursor), 200
 
 @router.get(
     "/detail/{remark_id}", 
@@ -3,6 +3,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import Field
 
+from app.dependencies.pagination import PaginationDep
 from app.dependencies.unitofwork import UOWDep
 from app.dependencies.users import get_current_user
 from app.models.users import User
@@ -59,7 +60,7 @@ async def logout(
 
 @router.get("/contractors", summary="Получить всех подрядчиков", status_code=status.HTTP_200_OK)
 @api_exception_handler
-async def get_contractors(uow: UOWDep, user: User = Depends(get_current_user)
+async def get_contractors(uow: UOWDep, pagination: PaginationDep, user: User = Depends(get_current_user)
 ) -> Annotated[SuccessResponseModel[list[SUsersContractor]] | ErrorEnvelopeModel, Field(discriminator="status")]:
     """**Получить всех подрядчиков**"""
-    return await UsersService().get_contractors(uow), 200
\ No newline at end of file
+    return await UsersService().get_contractors(uow, pagination.limit, pagination.cursor), 200
\ No newline at end of file
@@ -1,18 +1,63 @@
-from sqlalchemy import NullPool
+from sqlalchemy import NullPool, Pool, QueuePool
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config.main import settings
+from app.utils.query_stats import instrument_engine
 
 DATABASE_URL = settings.DATABASE_URL
-DATABASE_PARAMS = {}
+DATABASE_PARAMS = {
+    "connect_args": {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+    },
+}
 
 if settings.MODE == "TEST":
-    DATABASE_PARAMS = {"poolclass": NullPool}
+    DATABASE_PARAMS["poolclass"] = NullPool
+else:
+    DATABASE_PARAMS.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
 
 engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
 
+replica_engine = engine
+if settings.DB_REPLICA_URL:
+    replica_engine = create_async_engine(settings.DB_REPLICA_URL, **DATABASE_PARAMS)
+
+if settings.QUERY_STATS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(replica_engine)
+
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+async_replica_session_maker = async_sessionmaker(replica_engine, expire_on_commit=False)
+
+
+def _pool_stats(pool: Pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_stats() -> dict:
+    """Текущее состояние пула соединений воркера"""
+    stats = _pool_stats(engine.pool)
+    if replica_engine is not engine:
+        stats["replica"] = _pool_stats(replica_engine.pool)
+    return stats
 
 
 class Base(DeclarativeBase):
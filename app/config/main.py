@@ -17,12 +17,34 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Кэш авторизованных пользователей, TTL не больше времени жизни access токена
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 300
+
     DB_HOST: str = "localhost"
     DB_NAME: str = "dev_db_construct"
     DB_PORT: int = 5432
     DB_USER: str = "postgres"
     DB_PASS: str = "postgres"
 
+    # Пул соединений на один воркер gunicorn (итого воркеры * (POOL_SIZE + MAX_OVERFLOW) < max_connections)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # DSN read-реплики (postgresql+asyncpg://...), без него чтение идет в основную БД
+    DB_REPLICA_URL: str | None = None
+
+    # Счетчик SQL на запрос (Server-Timing, лог) и порог повторов одной формы запроса для предупреждения о N+1
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Текст самого медленного запроса попадает в лог, только если он дольше порога
+    QUERY_STATS_SLOW_SQL_MS: int = 200
+
     ACCESS_KEY_S3: str
     SECRET_KEY_S3: str
     ENDPOINT_URL_S3: str
@@ -36,6 +58,47 @@ class Settings(BaseSettings):
     
     ACCESS_EXPIRES_AT_MIN: int = 480
 
+    # Допустимое расстояние от пользователя до контура объекта при проверке гео
+    GEOFENCE_RADIUS_METERS: int = 200
+    # Проверять гео по индексу geofence в памяти воркера вместо запроса в PostGIS
+    GEOFENCE_IN_PROCESS: bool = False
+    GEOFENCE_INDEX_TTL_SECONDS: int = 600
+
+    # Знаков после запятой в координатах GeoJSON (6 ~ 0.1 м)
+    GEOJSON_PRECISION: int = 6
+    # До какого zoom карта получает кластеры вместо объектов и сколько ячеек сетки на тайл по стороне
+    VIEWPORT_CLUSTER_MAX_ZOOM: int = 11
+    VIEWPORT_CLUSTER_CELLS_PER_TILE: int = 4
+    # LRU-кэш MVT тайлов в воркере; между воркерами расхождение ограничено TTL
+    TILE_CACHE_MAX_SIZE: int = 2000
+    TILE_CACHE_TTL_SECONDS: int = 300
+    COUNTERS_CACHE_MAX_SIZE: int = 1000
+    COUNTERS_CACHE_TTL_SECONDS: int = 60
+
+    # Кэш меток nfc_uid -> (id, объект, label) в воркере; NOTIFY сбрасывает его во всех воркерах сразу,
+    # без него расхождение после изменения метки ограничено TTL
+    NFC_TAG_CACHE_MAX_SIZE: int = 10000
+    NFC_TAG_CACHE_TTL_SECONDS: int = 600
+    NFC_TAG_CACHE_NOTIFY: bool = False
+
+    # Офлайн-синхронизация сканирований NFC: размер пачки и насколько старые сканы принимаются
+    NFC_SYNC_MAX_SCANS: int = 1000
+    NFC_SYNC_MAX_AGE_DAYS: int = 30
+    # История сканирований NFC: сколько календарных дней максимум на одной странице
+    NFC_HISTORY_DEFAULT_DAYS: int = 30
+    NFC_HISTORY_MAX_DAYS: int = 366
+
+    # Месячные партиции history_object_nfc: сколько создавать наперед и сколько хранить
+    HISTORY_NFC_PARTITIONS_AHEAD: int = 3
+    # Как часто воркер сам досоздает партиции (помимо старта приложения)
+    HISTORY_NFC_ENSURE_INTERVAL_HOURS: int = 24
+    HISTORY_NFC_RETENTION_MONTHS: int = 36
+    # Схема, куда переносятся отсоединенные старые партиции (если не удалять их сразу)
+    HISTORY_NFC_ARCHIVE_SCHEMA: str = "archive"
+
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -43,5 +106,10 @@ class Settings(BaseSettings):
     def DATABASE_URL(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def DATABASE_DSN(self):
+        """DSN для прямого подключения asyncpg (без драйвера SQLAlchemy в схеме)"""
+        return f"postgresql://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
 
 settings = Settings()
@@ -0,0 +1,46 @@
+from typing import Annotated
+
+from fastapi import Depends, Query
+
+from app.config.main import settings
+from app.exceptions.objects import InvalidBBoxExc
+from app.models.enums import GeometryFormatEnum
+from app.schemas.geometry import BBox, GeometryOptions
+
+
+def get_geometry_options(
+    geometry_format: GeometryFormatEnum = Query(
+        GeometryFormatEnum.COORDS,
+        alias="format",
+        description="_coords_ - контуры списками координат, _geojson_ - GeoJSON из PostGIS в поле `geometry`",
+    ),
+    simplify: float | None = Query(
+        None,
+        gt=0,
+        description="Допуск упрощения контура (ST_SimplifyPreserveTopology) в градусах, 0.00001 ~ 1 м",
+    ),
+    precision: int = Query(
+        settings.GEOJSON_PRECISION,
+        ge=0,
+        le=15,
+        description="Знаков после запятой в координатах GeoJSON",
+    ),
+) -> GeometryOptions:
+    return GeometryOptions(format=geometry_format, simplify=simplify, precision=precision)
+
+
+GeometryOptionsDep = Annotated[GeometryOptions, Depends(get_geometry_options)]
+
+
+def get_bbox(
+    min_lon: float = Query(..., ge=-180, le=180, description="Западная граница"),
+    min_lat: float = Query(..., ge=-90, le=90, description="Южная граница"),
+    max_lon: float = Query(..., ge=-180, le=180, description="Восточная граница"),
+    max_lat: float = Query(..., ge=-90, le=90, description="Северная граница"),
+) -> BBox:
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise InvalidBBoxExc
+    return BBox(min_lon=min_lon, min_lat=min_lat, max_lon=max_lon, max_lat=max_lat)
+
+
+BBoxDep = Annotated[BBox, Depends(get_bbox)]
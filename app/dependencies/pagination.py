@@ -0,0 +1,23 @@
+from typing import Annotated
+
+from fastapi import Depends, Query
+
+from app.config.main import settings
+
+
+class Pagination:
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGINATION_DEFAULT_LIMIT,
+            ge=1,
+            le=settings.PAGINATION_MAX_LIMIT,
+            description="Размер страницы",
+        ),
+        cursor: str | None = Query(None, description="`next_cursor` из предыдущего ответа"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+PaginationDep = Annotated[Pagination, Depends(Pagination)]
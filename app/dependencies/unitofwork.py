@@ -1,8 +1,11 @@
-from typing import Annotated
+from functools import cached_property
+from typing import Annotated, ClassVar
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config.database import async_session_maker
+from app.config.database import async_replica_session_maker, async_session_maker
+from app.repositories.base import SQLAlchemyRepository
 from app.repositories.company import CompanyRepository
 from app.repositories.control_materials import (
     ListOfWorksRepository,
@@ -37,55 +40,100 @@ from app.repositories.violations import (
     ViolationsItemRepository,
     ViolationsRepository,
 )
+from app.utils.query_stats import get_query_stats
 
 
 class UnitOfWork:
+    # Репозитории создаются при первом обращении к атрибуту и живут до выхода из блока
+    repositories: ClassVar[dict[str, type[SQLAlchemyRepository]]] = {
+        "users": UsersRepository,
+        "refresh_session": RefreshSessionRepository,
+        "company": CompanyRepository,
+        "objects": ObjectsRepository,
+        "objects_categories": ObjectsCategoriesRepository,
+        "acts": ActsRepository,
+        "check_list_document": CheckListDocumentRepository,
+        "object_nfc": ObjectNFCRepository,
+        "history_object_nfc": HistoryObjectNFCRepository,
+        "remark_photo": RemarkPhotoRepository,
+        "remarks_item": RemarksItemRepository,
+        "remarks": RemarksRepository,
+        "violation_photo": ViolationPhotoRepository,
+        "violations_item": ViolationsItemRepository,
+        "violations": ViolationsRepository,
+        "materials": MaterialsRepository,
+        "user_object_access": UserObjectAccessRepository,
+        "remark_answer": RemarkAnswerRepository,
+        "remark_answer_file": RemarkAnswerFileRepository,
+        "violation_answer": ViolationAnswerRepository,
+        "violation_answer_file": ViolationAnswerFileRepository,
+        "check_list": CheckListRepository,
+        "stage_progress_work_photo": StageProgressWorkPhotoRepository,
+        "stage_progress_work_rejection_photo": StageProgressWorkRejectionPhotoRepository,
+        "stage_progress_work_rejection": StageProgressWorkRejectionRepository,
+        "list_of_works": ListOfWorksRepository,
+        "stage_progress_work": StageProgressWorkRepository,
+        "progress_work": ProgressWorkRepository,
+    }
+
     def __init__(self):
         self.session_factory = async_session_maker
+        self.read_only_session_factory = async_replica_session_maker
+        self._session: AsyncSession | None = None
+        self._read_only = False
+
+    @property
+    def session(self) -> AsyncSession:
+        """Сессия открывается только при первом использовании"""
+        if self._session is None:
+            factory = self.read_only_session_factory if self._read_only else self.session_factory
+            self._session = factory()
+            stats = get_query_stats()
+            if stats is not None:
+                stats.sessions += 1
+        return self._session
+
+    def read_only(self) -> "UnitOfWork":
+        """Выполнить следующий блок `async with` на read-реплике (только для чтения)"""
+        self._read_only = True
+        return self
+
+    @cached_property
+    def images(self) -> ImagesRepository:
+        return ImagesRepository()
+
+    def __getattr__(self, name: str):
+        repository_class = self.repositories.get(name)
+        if repository_class is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+        repository = repository_class(self.session)
+        self.__dict__[name] = repository
+        return repository
+
+    def _reset(self) -> None:
+        self._session = None
+        for name in self.repositories:
+            self.__dict__.pop(name, None)
 
     async def __aenter__(self):
-        self.session = self.session_factory()
-
-        # Repositories
-        self.images = ImagesRepository()
-        self.users = UsersRepository(self.session)
-        self.refresh_session = RefreshSessionRepository(self.session)
-        self.company = CompanyRepository(self.session)
-        self.objects = ObjectsRepository(self.session)
-        self.objects_categories = ObjectsCategoriesRepository(self.session)
-        self.acts = ActsRepository(self.session)
-        self.check_list_document = CheckListDocumentRepository(self.session)
-        self.object_nfc = ObjectNFCRepository(self.session)
-        self.history_object_nfc = HistoryObjectNFCRepository(self.session)
-        self.remark_photo = RemarkPhotoRepository(self.session)
-        self.remarks_item = RemarksItemRepository(self.session)
-        self.remarks = RemarksRepository(self.session)
-        self.violation_photo = ViolationPhotoRepository(self.session)
-        self.violations_item = ViolationsItemRepository(self.session)
-        self.violations = ViolationsRepository(self.session)
-        self.materials = MaterialsRepository(self.session)
-        self.user_object_access = UserObjectAccessRepository(self.session)
-        self.remark_answer = RemarkAnswerRepository(self.session)
-        self.remark_answer_file = RemarkAnswerFileRepository(self.session)
-        self.violation_answer = ViolationAnswerRepository(self.session)
-        self.violation_answer_file = ViolationAnswerFileRepository(self.session)
-        self.check_list = CheckListRepository(self.session)
-        self.stage_progress_work_photo = StageProgressWorkPhotoRepository(self.session)
-        self.stage_progress_work_rejection_photo = StageProgressWorkRejectionPhotoRepository(self.session)
-        self.stage_progress_work_rejection = StageProgressWorkRejectionRepository(self.session)
-        self.list_of_works = ListOfWorksRepository(self.session)
-        self.stage_progress_work = StageProgressWorkRepository(self.session)
-        self.progress_work = ProgressWorkRepository(self.session)
-        
+        self._reset()
+        return self
+
     async def __aexit__(self, *args):
-        await self.rollback()
-        await self.session.close()
+        if self._session is not None:
+            await self.rollback()
+            await self._session.close()
+        self._reset()
+        self._read_only = False
 
     async def commit(self):
-        await self.session.commit()
+        if self._session is not None:
+            await self._session.commit()
 
     async def rollback(self):
-        await self.session.rollback()
+        if self._session is not None:
+            await self._session.rollback()
 
 
 UOWDep = Annotated[UnitOfWork, Depends(UnitOfWork)]
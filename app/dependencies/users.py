@@ -17,9 +17,15 @@ from app.exceptions.users import (
 )
 from app.models.enums import UserRoleEnum
 from app.models.users import User
+from app.utils.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=min(settings.USER_CACHE_TTL_SECONDS, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+)
+
 
 async def get_token(request: Request) -> str:
     try:
@@ -34,21 +40,28 @@ async def get_token(request: Request) -> str:
 
 async def get_current_user(uow: UOWDep, token: str = Depends(get_token)) -> User:
     try:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
+        except ExpiredSignatureError:
+            raise TokenExpiredExc
+        except JWTError:
+            raise IncorrectTokenFormatExc
+        user_id: str = payload.get("sub")
+        if not user_id:
+            raise UserIsNotPresentExc
+
+        user: User | None = user_cache.get(user_id)
+        if user:
+            return user
+
         async with uow:
-            try:
-                payload = jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
-            except ExpiredSignatureError:
-                raise TokenExpiredExc
-            except JWTError:
-                raise IncorrectTokenFormatExc
-            user_id: str = payload.get("sub")
-            if not user_id:
-                raise UserIsNotPresentExc
-            user: User = await uow.users.find_one_or_none(id=uuid.UUID(user_id))
+            user = await uow.users.find_one_or_none(id=uuid.UUID(user_id))
             if not user:
                 raise UserIsNotPresentExc
             uow.session.expunge(user)
-            return user
+
+        user_cache.set(user_id, user)
+        return user
 
     except TokenExpiredExc:
         raise TokenExpiredExc
@@ -58,6 +71,14 @@ async def get_current_user(uow: UOWDep, token: str = Depends(get_token)) -> User
         raise UserIsNotPresentExc
 
 
+def invalidate_user_cache(user_id: uuid.UUID | None = None) -> None:
+    """Сбросить кэш пользователя после смены роли/компании (без user_id - весь кэш)"""
+    if user_id is None:
+        user_cache.clear()
+    else:
+        user_cache.pop(str(user_id))
+
+
 def create_access_token(user_id: uuid.UUID) -> str:
     to_encode = {
         "sub": str(user_id),
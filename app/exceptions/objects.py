@@ -41,4 +41,12 @@ class ObjectCategoryNotFoundExc(BaseHTTPException):
     
 class UserObjectSessionNotFoundExc(BaseHTTPException):
     status_code = status.HTTP_404_NOT_FOUND
-    message = "User object session not found"
\ No newline at end of file
+    message = "User object session not found"
+    
+class InvalidBBoxExc(BaseHTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Invalid bbox"
+    
+class InvalidTileExc(BaseHTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Invalid tile coordinates"
\ No newline at end of file
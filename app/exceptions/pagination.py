@@ -0,0 +1,8 @@
+from fastapi import status
+
+from app.exceptions.base import BaseHTTPException
+
+
+class InvalidCursorExc(BaseHTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    message = "Invalid pagination cursor"
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -6,10 +8,22 @@ from fastapi.responses import JSONResponse
 from fastapi_versionizer.versionizer import Versionizer
 
 from app.api.routers import all_routers
+from app.config.database import get_pool_stats
 from app.config.main import settings
+from app.dependencies.unitofwork import UnitOfWork
 from app.exceptions.base import BaseHTTPException
 from app.mock.mock import init_app
+from app.repositories.nfc import NFC_TAG_CHANNEL
 from app.schemas.base import ErrorEnvelopeModel
+from app.services.history_nfc import HistoryNFCService, ensure_history_partitions_periodically
+from app.services.nfc import invalidate_nfc_tag, nfc_tag_cache
+from app.utils.pg_listen import listen
+from app.utils.query_stats import (
+    log_query_stats,
+    reset_query_stats,
+    setup_query_stats_logging,
+    start_query_stats,
+)
 
 openapi_url = None
 redoc_url = None
@@ -21,9 +35,26 @@ if settings.VISIBILITY_DOCUMENTATION is True:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if settings.QUERY_STATS_ENABLED:
+        setup_query_stats_logging()
+
+    partitions_task = None
     if not settings.MODE == "TEST":
         await init_app()
+        await HistoryNFCService().ensure_partitions(UnitOfWork())
+        partitions_task = asyncio.create_task(ensure_history_partitions_periodically())
+
+    nfc_tag_listener = None
+    if settings.NFC_TAG_CACHE_NOTIFY:
+        # после (пере)подключения кэш сбрасывается целиком: NOTIFY за время обрыва потеряны
+        nfc_tag_listener = listen(settings.DATABASE_DSN, NFC_TAG_CHANNEL, invalidate_nfc_tag, nfc_tag_cache.clear)
     yield
+    if nfc_tag_listener:
+        await nfc_tag_listener.close()
+    if partitions_task:
+        partitions_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await partitions_task
 
 
 app = FastAPI(
@@ -59,6 +90,30 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Число и время SQL-запросов на каждый HTTP-запрос"""
+    if not settings.QUERY_STATS_ENABLED:
+        return await call_next(request)
+
+    stats, token = start_query_stats()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_query_stats(token)
+
+    response.headers.append("Server-Timing", stats.server_timing())
+    log_query_stats(
+        request.method,
+        request.url.path,
+        response.status_code,
+        stats,
+        settings.N_PLUS_ONE_THRESHOLD,
+        settings.QUERY_STATS_SLOW_SQL_MS,
+    )
+    return response
+
+
 @app.exception_handler(BaseHTTPException)
 async def base_service_exception_handler(request: Request, exc: BaseHTTPException):
     error_envelope = ErrorEnvelopeModel(
@@ -79,4 +134,10 @@ versions = Versionizer(
 @app.get("/health", include_in_schema=False)
 def health_check() -> dict:
     """Для проверки жизни приложения"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/db-pool", include_in_schema=False)
+def db_pool_stats() -> dict:
+    """Для подбора размера пула соединений под max_connections"""
+    return get_pool_stats()
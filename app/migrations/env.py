@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -34,6 +35,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Партиции history_object_nfc создаются функцией в БД, а не моделями: без фильтра
+# autogenerate предлагал бы удалить их (и архивные партиции) как лишние таблицы
+HISTORY_NFC_PARTITION = re.compile(r"^history_object_nfc_(p\d{6}|default)$")
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "schema":
+        return name != settings.HISTORY_NFC_ARCHIVE_SCHEMA
+    if type_ == "table":
+        return not HISTORY_NFC_PARTITION.match(name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -58,6 +72,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_schemas=False,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -79,7 +95,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_schemas=False,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,33 @@
+"""objects geom indexes
+
+Revision ID: 73375b49590c
+Revises: 76e1c21db795
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73375b49590c'
+down_revision: Union[str, Sequence[str], None] = '76e1c21db795'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # idx_objects_geom мог быть создан geoalchemy2 вместе с таблицей
+    op.execute("CREATE INDEX IF NOT EXISTS idx_objects_geom ON objects USING gist (geom)")
+    # для ST_DWithin по geography (расстояние в метрах)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_objects_geom_geography ON objects USING gist ((geom::geography))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # idx_objects_geom удаляется в downgrade init-миграции
+    op.execute("DROP INDEX IF EXISTS idx_objects_geom_geography")
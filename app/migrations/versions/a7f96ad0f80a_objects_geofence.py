@@ -0,0 +1,49 @@
+"""objects geofence
+
+Revision ID: a7f96ad0f80a
+Revises: 73375b49590c
+Create Date: 2026-10-18 11:40:08.517342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import geoalchemy2
+import sqlalchemy as sa
+
+from app.config.main import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f96ad0f80a'
+down_revision: Union[str, Sequence[str], None] = '73375b49590c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('objects_categories', sa.Column('geofence_radius', sa.Integer(), nullable=True))
+    op.add_column('objects', sa.Column('geofence_radius', sa.Integer(), nullable=True))
+    op.add_column('objects', sa.Column(
+        'geofence',
+        geoalchemy2.types.Geography(geometry_type='GEOMETRY', srid=4326, spatial_index=False),
+        nullable=True
+    ))
+    op.execute(
+        sa.text(
+            "UPDATE objects SET geofence = ST_Buffer(geom::geography, "
+            "COALESCE(objects.geofence_radius, "
+            "(SELECT c.geofence_radius FROM objects_categories c WHERE c.id = objects.category_id), "
+            ":radius))"
+        ).bindparams(radius=settings.GEOFENCE_RADIUS_METERS)
+    )
+    op.create_index('idx_objects_geofence', 'objects', ['geofence'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_objects_geofence', table_name='objects', postgresql_using='gist')
+    op.drop_column('objects', 'geofence')
+    op.drop_column('objects', 'geofence_radius')
+    op.drop_column('objects_categories', 'geofence_radius')
@@ -0,0 +1,43 @@
+"""user object access unique
+
+Revision ID: b2d9e61f4a30
+Revises: 4c87950e7e8d
+Create Date: 2026-10-18 15:02:17.384905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d9e61f4a30'
+down_revision: Union[str, Sequence[str], None] = '4c87950e7e8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # дубли от гонки verify_nfc: оставляем запись с самым поздним сроком доступа
+    op.execute(
+        """
+        DELETE FROM user_object_access a
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY user_id, object_id
+                ORDER BY is_active DESC, access_expires_at DESC NULLS LAST, created_at DESC
+            ) AS rn
+            FROM user_object_access
+        ) d
+        WHERE a.id = d.id AND d.rn > 1
+        """
+    )
+    op.create_unique_constraint(
+        'uq_user_object_access_user_id_object_id', 'user_object_access', ['user_id', 'object_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_object_access_user_id_object_id', 'user_object_access', type_='unique')
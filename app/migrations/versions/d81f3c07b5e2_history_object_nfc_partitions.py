@@ -0,0 +1,104 @@
+"""history object nfc partitions
+
+Revision ID: d81f3c07b5e2
+Revises: b2d9e61f4a30
+Create Date: 2026-10-18 16:21:44.915230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config.main import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f3c07b5e2'
+down_revision: Union[str, Sequence[str], None] = 'b2d9e61f4a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Месячные партиции history_object_nfc_pYYYYMM (границы по UTC) от месяца since до текущего + months_ahead.
+# Вызывается при старте приложения и командой app.scripts.history_nfc; advisory lock - от гонки воркеров.
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION history_object_nfc_ensure_partitions(
+    months_ahead integer, since timestamptz DEFAULT now()
+) RETURNS void AS $$
+DECLARE
+    month_start timestamp := date_trunc('month', since AT TIME ZONE 'UTC');
+    last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead);
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('history_object_nfc_partitions'));
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF history_object_nfc FOR VALUES FROM (%L) TO (%L)',
+            'history_object_nfc_p' || to_char(month_start, 'YYYYMM'),
+            month_start AT TIME ZONE 'UTC',
+            (month_start + interval '1 month') AT TIME ZONE 'UTC'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.rename_table('history_object_nfc', 'history_object_nfc_old')
+    op.execute("ALTER TABLE history_object_nfc_old RENAME CONSTRAINT history_object_nfc_pkey TO history_object_nfc_old_pkey")
+
+    op.create_table('history_object_nfc',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('nfc_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['nfc_id'], ['object_nfc.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index(
+        'ix_history_object_nfc_user_id_created_at',
+        'history_object_nfc',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute(
+        sa.text(
+            "SELECT history_object_nfc_ensure_partitions("
+            ":months_ahead, COALESCE((SELECT min(created_at) FROM history_object_nfc_old), now()))"
+        ).bindparams(months_ahead=settings.HISTORY_NFC_PARTITIONS_AHEAD)
+    )
+    op.execute(
+        "INSERT INTO history_object_nfc (id, nfc_id, user_id, created_at) "
+        "SELECT id, nfc_id, user_id, created_at FROM history_object_nfc_old"
+    )
+    op.drop_table('history_object_nfc_old')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('history_object_nfc', 'history_object_nfc_partitioned')
+
+    op.create_table('history_object_nfc',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('nfc_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['nfc_id'], ['object_nfc.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name='history_object_nfc_plain_pkey')
+    )
+    op.execute(
+        "INSERT INTO history_object_nfc (id, nfc_id, user_id, created_at) "
+        "SELECT id, nfc_id, user_id, created_at FROM history_object_nfc_partitioned"
+    )
+    # партиции удаляются вместе с родительской таблицей
+    op.drop_table('history_object_nfc_partitioned')
+    op.execute("ALTER TABLE history_object_nfc RENAME CONSTRAINT history_object_nfc_plain_pkey TO history_object_nfc_pkey")
+    op.execute("DROP FUNCTION IF EXISTS history_object_nfc_ensure_partitions(integer, timestamptz)")
@@ -0,0 +1,99 @@
+"""history object nfc default partition
+
+Revision ID: f3b7d15a9c42
+Revises: e6a4c2b91d07
+Create Date: 2026-10-18 19:42:03.518164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config.main import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d15a9c42'
+down_revision: Union[str, Sequence[str], None] = 'e6a4c2b91d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# То же, что в d81f3c07b5e2, но с DEFAULT-партицией: если в нее уже попали строки месяца,
+# партиция месяца создается отдельной таблицей, строки переносятся и таблица подключается
+# (иначе CREATE ... PARTITION OF падает на проверке DEFAULT-партиции). Без DEFAULT-партиции
+# (после downgrade) работает как прежняя версия.
+ENSURE_PARTITIONS_WITH_DEFAULT_FUNCTION = """
+CREATE OR REPLACE FUNCTION history_object_nfc_ensure_partitions(
+    months_ahead integer, since timestamptz DEFAULT now()
+) RETURNS void AS $$
+DECLARE
+    month_start timestamp := date_trunc('month', since AT TIME ZONE 'UTC');
+    last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead);
+    has_default boolean := to_regclass('history_object_nfc_default') IS NOT NULL;
+    moved_rows boolean;
+    partition_name text;
+    range_from timestamptz;
+    range_to timestamptz;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('history_object_nfc_partitions'));
+    WHILE month_start <= last_month LOOP
+        partition_name := 'history_object_nfc_p' || to_char(month_start, 'YYYYMM');
+        range_from := month_start AT TIME ZONE 'UTC';
+        range_to := (month_start + interval '1 month') AT TIME ZONE 'UTC';
+
+        IF to_regclass(partition_name) IS NULL THEN
+            moved_rows := false;
+            IF has_default THEN
+                EXECUTE 'SELECT EXISTS (SELECT 1 FROM history_object_nfc_default '
+                    'WHERE created_at >= $1 AND created_at < $2)'
+                    INTO moved_rows USING range_from, range_to;
+            END IF;
+
+            IF moved_rows THEN
+                EXECUTE format('CREATE TABLE %I (LIKE history_object_nfc INCLUDING DEFAULTS)', partition_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM history_object_nfc_default '
+                    'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    range_from, range_to, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE history_object_nfc ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, range_from, range_to
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF history_object_nfc FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, range_from, range_to
+                );
+            END IF;
+        END IF;
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # страховка: скан за месяц без партиции попадает сюда, а не падает с "no partition of relation found"
+    op.execute("CREATE TABLE history_object_nfc_default PARTITION OF history_object_nfc DEFAULT")
+    op.execute(ENSURE_PARTITIONS_WITH_DEFAULT_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # функция без DEFAULT-партиции ведет себя как прежняя, поэтому не откатывается
+    op.execute("ALTER TABLE history_object_nfc DETACH PARTITION history_object_nfc_default")
+    op.rename_table('history_object_nfc_default', 'history_object_nfc_default_old')
+    op.execute(
+        sa.text(
+            "SELECT history_object_nfc_ensure_partitions("
+            ":months_ahead, COALESCE((SELECT min(created_at) FROM history_object_nfc_default_old), now()))"
+        ).bindparams(months_ahead=settings.HISTORY_NFC_PARTITIONS_AHEAD)
+    )
+    op.execute("INSERT INTO history_object_nfc SELECT * FROM history_object_nfc_default_old")
+    op.drop_table('history_object_nfc_default_old')
@@ -35,6 +35,10 @@ class ObjectStatusesEnum(str, enum.Enum):
     KNOWN = "known"
     ACT = "act"
     
+class GeometryFormatEnum(str, enum.Enum):
+    COORDS = "coords"
+    GEOJSON = "geojson"
+    
 class ObjectTypeFilter(str, enum.Enum):
     ALL = "all"
     ACTIVE = "active"
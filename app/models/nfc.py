@@ -1,7 +1,7 @@
 import uuid
 from datetime import UTC, datetime
 
-from sqlalchemy import TIMESTAMP, UUID, ForeignKey, String
+from sqlalchemy import TIMESTAMP, UUID, ForeignKey, Index, String, desc
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -36,6 +36,13 @@ class HistoryObjectNFC(Base):
     user_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID, ForeignKey("users.id", ondelete="CASCADE")
         )
+    # ключ партиционирования (по месяцам) обязан входить в первичный ключ
     created_at: Mapped[datetime] = mapped_column(
-        TIMESTAMP(timezone=True), default=lambda: datetime.now(UTC), server_default=func.now()
-        )
\ No newline at end of file
+        TIMESTAMP(timezone=True), primary_key=True, default=lambda: datetime.now(UTC), server_default=func.now()
+        )
+
+    # Партиции создает history_object_nfc_ensure_partitions (миграция), индекс наследуется каждой партицией
+    __table_args__ = (
+        Index("ix_history_object_nfc_user_id_created_at", "user_id", desc("created_at")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
\ No newline at end of file
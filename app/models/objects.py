@@ -1,8 +1,8 @@
 import uuid
 from datetime import UTC, datetime
 
-from geoalchemy2 import Geometry
-from sqlalchemy import TIMESTAMP, UUID, ForeignKey, String, Text
+from geoalchemy2 import Geography, Geometry
+from sqlalchemy import TIMESTAMP, UUID, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -49,6 +49,11 @@ class Objects(Base):
     geom: Mapped[str] = mapped_column(
         Geometry(srid=4326)
     )
+    # Контур geom с буфером geofence_radius, по нему проверяется гео пользователя
+    geofence: Mapped[str | None] = mapped_column(
+        Geography(geometry_type="GEOMETRY", srid=4326), nullable=True, deferred=True
+    )
+    geofence_radius: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=lambda: datetime.now(UTC), server_default=func.now()
     )
@@ -69,6 +74,18 @@ class Objects(Base):
     user_access = relationship("UserObjectAccess", backref="object", lazy="selectin")
 
     
+    # Списки, счетчики и дашборд: фильтр по компании/подрядчику (+ object_type), keyset по (created_at, id);
+    # счетчики вкладок группируют по (category_id, object_type) - index-only scan, он же индекс FK категории
+    __table_args__ = (
+        Index("ix_objects_company_id_object_type_created_at", "company_id", "object_type", "created_at", "id"),
+        Index("ix_objects_company_id_created_at", "company_id", "created_at", "id"),
+        Index("ix_objects_contractor_id_object_type_created_at", "contractor_id", "object_type", "created_at", "id"),
+        Index("ix_objects_contractor_id_created_at", "contractor_id", "created_at", "id"),
+        Index("ix_objects_company_id_category_id_object_type", "company_id", "category_id", "object_type"),
+        Index("ix_objects_contractor_id_category_id_object_type", "contractor_id", "category_id", "object_type"),
+        Index("ix_objects_category_id_object_type", "category_id", "object_type"),
+    )
+    
     @property
     def is_nfc(self) -> bool:
         return bool(self.nfc_items)
@@ -123,4 +140,5 @@ class ObjectsCategories(Base):
     __tablename__ = "objects_categories"
 
     id: Mapped[int] = mapped_column(UUID, default=uuid.uuid4, primary_key=True)
-    title: Mapped[str] = mapped_column(String(255))
\ No newline at end of file
+    title: Mapped[str] = mapped_column(String(255))
+    geofence_radius: Mapped[int | None] = mapped_column(Integer, nullable=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import uuid
 from datetime import UTC, datetime
 
-from sqlalchemy import TIMESTAMP, UUID, BigInteger, Boolean, ForeignKey, Index, Integer, String
+from sqlalchemy import TIMESTAMP, UUID, BigInteger, Boolean, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -48,6 +48,11 @@ class UserObjectAccess(Base):
         server_default=func.now()
     )
 
+    # Одна запись доступа на пару; по ней же идет upsert при проверке NFC
+    __table_args__ = (
+        UniqueConstraint("user_id", "object_id", name="uq_user_object_access_user_id_object_id"),
+    )
+
 class RefreshSession(Base):
     """Таблица для сессий пользователя"""
 
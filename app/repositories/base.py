@@ -1,8 +1,25 @@
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
 from typing import TypeVar
 
-from sqlalchemy import delete, func, insert, select, update
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Label,
+    Select,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.utils.pagination import decode_cursor, encode_cursor
+
 T = TypeVar("T")
 
 class SQLAlchemyRepository:
@@ -40,6 +57,20 @@ class SQLAlchemyRepository:
         result = await self.session.execute(query)
         return result.scalars().one()
 
+    async def insert_many(self, rows: list[dict], returning: bool = True) -> list[T]:
+        """Добавить несколько сущностей одним многострочным INSERT"""
+        if not rows:
+            return []
+
+        query = insert(self.model)
+        if not returning:
+            await self.session.execute(query.values(rows))
+            return []
+
+        query = query.returning(self.model, sort_by_parameter_order=True)
+        result = await self.session.execute(query, rows)
+        return result.scalars().all()
+
     async def update_by_filter(self, update_data: dict, *filter, **filter_by) -> T:
         """Обновить сущность по фильтру"""
         query = (
@@ -52,6 +83,24 @@ class SQLAlchemyRepository:
         result = await self.session.execute(query)
         return result.scalars().one()
     
+    async def update_returning_or_none(self, update_data: dict, *filter, **filter_by) -> T | None:
+        """Обновить сущность по фильтру, None если ее нет (без предварительного SELECT)"""
+        query = (
+            update(self.model)
+            .filter(*filter)
+            .filter_by(**filter_by)
+            .values(**update_data)
+            .returning(self.model)
+        )
+        result = await self.session.execute(query)
+        return result.scalars().one_or_none()
+
+    async def delete_returning_or_none(self, *filter, **filter_by) -> T | None:
+        """Удалить сущность по фильтру, None если ее нет (без предварительного SELECT)"""
+        query = delete(self.model).filter(*filter).filter_by(**filter_by).returning(self.model)
+        result = await self.session.execute(query)
+        return result.scalars().one_or_none()
+
     async def update_many_by_filter(self, update_data: dict, *filter, **filter_by) -> T:
         """Обновить сущность по фильтру"""
         query = (
@@ -80,3 +129,68 @@ class SQLAlchemyRepository:
         query = select(self.model).filter_by(**filter_by)
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    def project(self, schema: type[BaseModel], model=None, prefix: str | None = None) -> list[ColumnElement]:
+        """
+        Колонки модели, которые нужны схеме (по совпадению имен полей и колонок).
+        С `prefix` колонки получают label `prefix__field` для вложенной схемы.
+        """
+        model = model or self.model
+        column_names = {attr.key for attr in inspect(model).column_attrs}
+        return [
+            getattr(model, name).label(f"{prefix}__{name}") if prefix else getattr(model, name)
+            for name in schema.model_fields
+            if name in column_names
+        ]
+
+    @staticmethod
+    def unflatten(row: Mapping) -> dict:
+        """Собрать вложенные объекты из колонок `prefix__field`; пустой вложенный объект -> None"""
+        data, nested = {}, defaultdict(dict)
+        for key, value in row.items():
+            prefix, sep, name = key.partition("__")
+            if sep:
+                nested[prefix][name] = value
+            else:
+                data[key] = value
+
+        for prefix, values in nested.items():
+            data[prefix] = values if any(v is not None for v in values.values()) else None
+        return data
+
+    async def find_all_projected(self, schema: type[BaseModel], **filter_by) -> list[BaseModel]:
+        """Найти сущности по фильтру, выбирая только колонки схемы"""
+        query = select(*self.project(schema)).filter_by(**filter_by)
+        result = await self.session.execute(query)
+        return [schema.model_validate(dict(row)) for row in result.mappings()]
+
+    async def paginate(
+        self,
+        query: Select,
+        keyset: Sequence[ColumnElement],
+        limit: int,
+        cursor: str | None = None,
+        descending: bool = False,
+        scalars: bool = False,
+    ) -> tuple[list, str | None]:
+        """
+        Keyset-пагинация: `keyset` - уникальный набор колонок сортировки (последней идет id).
+        Колонки с label должны присутствовать в select под тем же именем.
+        """
+        columns = [c.element if isinstance(c, Label) else c for c in keyset]
+
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            position = tuple_(*columns)
+            after = tuple_(*(literal(v, c.type) for v, c in zip(values, columns, strict=True)))
+            query = query.where(position < after if descending else position > after)
+
+        query = query.order_by(*(c.desc() if descending else c.asc() for c in columns)).limit(limit + 1)
+        result = await self.session.execute(query)
+        rows = result.unique().scalars().all() if scalars else result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in keyset])
+        return rows, next_cursor
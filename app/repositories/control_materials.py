@@ -107,9 +107,11 @@ class ProgressWorkRepository(SQLAlchemyRepository):
 
         return float(avg_percent or 0.0)
         
-    async def list_work(self, object_id: uuid.UUID):
+    async def list_work(
+        self, object_id: uuid.UUID, limit: int, cursor: str | None = None
+    ) -> tuple[list[ProgressWork], str | None]:
         """
-        Получить все ходы работ по object_id с подгрузкой этапов.
+        Получить ходы работ по object_id с подгрузкой этапов (постранично).
         """
         query = (
             select(ProgressWork)
@@ -117,8 +119,8 @@ class ProgressWorkRepository(SQLAlchemyRepository):
                 selectinload(ProgressWork.stages)
             )
             .where(ProgressWork.object_id == object_id)
-            .order_by(ProgressWork.date_from)
         )
 
-        result = await self.session.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+        return await self.paginate(
+            query, (ProgressWork.date_from, ProgressWork.id), limit, cursor, scalars=True
+        )
\ No newline at end of file
@@ -1,58 +1,287 @@
+import re
 import uuid
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    JSON,
+    TIMESTAMP,
+    UUID,
+    Date,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    table,
+    text,
+    tuple_,
+    values,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.config.main import settings
 from app.models.nfc import HistoryObjectNFC, ObjectNFC
 from app.models.objects import Objects
 from app.models.users import User
 from app.repositories.base import SQLAlchemyRepository
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Канал LISTEN/NOTIFY для сброса кэша меток в других воркерах, payload - nfc_uid
+NFC_TAG_CHANNEL = "nfc_tag_changed"
 
 
 class ObjectNFCRepository(SQLAlchemyRepository):
     model = ObjectNFC
+    scan_day = cast(HistoryObjectNFC.created_at, Date)
+    # ключ сканирования в истории, по нему курсор страницы
+    scan_key = (HistoryObjectNFC.created_at, HistoryObjectNFC.id)
 
     def __init__(self, session: AsyncSession):
         self.session = session
-        
-    async def history_all(self, user: User):
+
+    async def find_by_uids(self, nfc_uids: Iterable[str]) -> list:
+        """Метки по списку uid одним запросом"""
         stmt = (
+            select(ObjectNFC.id, ObjectNFC.nfc_uid, ObjectNFC.object_id, ObjectNFC.label)
+            .where(ObjectNFC.nfc_uid.in_(set(nfc_uids)))
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def notify_tag_changed(self, nfc_uid: str) -> None:
+        """NOTIFY остальным воркерам о смене метки; доставляется только после коммита транзакции"""
+        if settings.NFC_TAG_CACHE_NOTIFY:
+            await self.session.execute(select(func.pg_notify(NFC_TAG_CHANNEL, nfc_uid)))
+
+    def _position(self, values: list):
+        """(created_at, id) сканирования - для сравнения с tuple_(*scan_key)"""
+        return tuple_(*(literal(v, c.type) for v, c in zip(values, self.scan_key, strict=True)))
+
+    def _scans(self, user: User, object_id: uuid.UUID | None, *columns):
+        """Сканирования пользователя (по индексу user_id, created_at DESC), при object_id - одного объекта"""
+        stmt = select(*columns).select_from(HistoryObjectNFC).where(HistoryObjectNFC.user_id == user.id)
+        if object_id:
+            stmt = (
+                stmt.join(ObjectNFC, ObjectNFC.id == HistoryObjectNFC.nfc_id)
+                .where(ObjectNFC.object_id == object_id)
+            )
+        return stmt
+
+    async def _last_scan_day(self, user: User, object_id: uuid.UUID | None, before: list | None) -> date | None:
+        """День последнего сканирования раньше позиции before (created_at, id)"""
+        stmt = self._scans(user, object_id, cast(func.max(HistoryObjectNFC.created_at), Date))
+        if before:
+            stmt = stmt.where(tuple_(*self.scan_key) < self._position(before))
+        result = await self.session.execute(stmt)
+        return result.scalar()
+
+    async def history(
+        self,
+        user: User,
+        limit: int,
+        days: int,
+        cursor: str | None = None,
+        object_id: uuid.UUID | None = None,
+    ) -> tuple[list, str | None]:
+        """
+        История сканирований, сгруппированная в Postgres по объекту и дню.
+        Страница - не больше `limit` последних сканирований до курсора и не шире `days` календарных дней
+        от дня первого из них; курсор - (время, id) последнего сканирования страницы.
+        """
+        before = decode_cursor(cursor, self.scan_key) if cursor else None
+        last_day = await self._last_scan_day(user, object_id, before)
+        if not last_day:
+            return [], None
+
+        window_start = last_day + timedelta(days=1) - timedelta(days=days)
+        keys_stmt = (
+            self._scans(user, object_id, *self.scan_key)
+            .where(HistoryObjectNFC.created_at >= literal(window_start, Date))
+            .order_by(HistoryObjectNFC.created_at.desc(), HistoryObjectNFC.id.desc())
+            .limit(limit + 1)
+        )
+        if before:
+            keys_stmt = keys_stmt.where(tuple_(*self.scan_key) < self._position(before))
+        keys = (await self.session.execute(keys_stmt)).all()
+        more_in_window = len(keys) > limit
+        first, last = keys[0], keys[min(len(keys), limit) - 1]
+
+        scan_date = self.scan_day.label("scan_date")
+        days_stmt = (
             select(
-                Objects.using_id,
-                Objects.title,
-                func.date(HistoryObjectNFC.created_at).label("scan_date"),
-                ObjectNFC.label,
-                HistoryObjectNFC.created_at.label("scanned_at"),
+                ObjectNFC.object_id,
+                scan_date,
+                func.max(HistoryObjectNFC.created_at).label("last_scan"),
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("label", ObjectNFC.label, "scanned_at", HistoryObjectNFC.created_at),
+                        HistoryObjectNFC.created_at.desc(),
+                    )
+                ).label("scans"),
             )
+            .select_from(HistoryObjectNFC)
             .join(ObjectNFC, ObjectNFC.id == HistoryObjectNFC.nfc_id)
-            .join(Objects, Objects.id == ObjectNFC.object_id)
-            .where(HistoryObjectNFC.user_id == user.id)
-            .order_by(HistoryObjectNFC.created_at.desc())
+            .where(
+                HistoryObjectNFC.user_id == user.id,
+                # границы по created_at - для индекса и отсечения партиций, по (created_at, id) - точные
+                HistoryObjectNFC.created_at >= last.created_at,
+                HistoryObjectNFC.created_at <= first.created_at,
+                tuple_(*self.scan_key) >= self._position(list(last)),
+                tuple_(*self.scan_key) <= self._position(list(first)),
+            )
+            .group_by(ObjectNFC.object_id, scan_date)
         )
+        if object_id:
+            days_stmt = days_stmt.where(ObjectNFC.object_id == object_id)
+        days_subquery = days_stmt.subquery("days")
 
-        result = await self.session.execute(stmt)
-        return result.mappings().all()
-        
-    async def history(self, user: User, object_id: uuid.UUID):
         stmt = (
             select(
-                Objects.using_id,
                 Objects.title,
-                func.date(HistoryObjectNFC.created_at).label("scan_date"),
-                ObjectNFC.label,
-                HistoryObjectNFC.created_at.label("scanned_at"),
+                Objects.using_id,
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("date", days_subquery.c.scan_date, "scans", days_subquery.c.scans),
+                        days_subquery.c.scan_date.desc(),
+                    ),
+                    type_=JSON,
+                ).label("data"),
             )
-            .join(ObjectNFC, ObjectNFC.id == HistoryObjectNFC.nfc_id)
-            .join(Objects, Objects.id == ObjectNFC.object_id)
-            .where(HistoryObjectNFC.user_id == user.id, ObjectNFC.object_id == object_id)
-            .order_by(HistoryObjectNFC.created_at.desc())
+            .join(Objects, Objects.id == days_subquery.c.object_id)
+            .group_by(Objects.id)
+            .order_by(func.max(days_subquery.c.last_scan).desc(), Objects.id)
         )
-
         result = await self.session.execute(stmt)
-        return result.mappings().all()
+        rows = result.all()
+
+        next_cursor = None
+        if more_in_window or await self._last_scan_day(user, object_id, list(last)):
+            next_cursor = encode_cursor(list(last))
+        return rows, next_cursor
         
 class HistoryObjectNFCRepository(SQLAlchemyRepository):
     model = HistoryObjectNFC
+    partition_name = re.compile(r"^history_object_nfc_p(\d{4})(\d{2})$")
+    default_partition = "history_object_nfc_default"
 
     def __init__(self, session: AsyncSession):
-        self.session = session
\ No newline at end of file
+        self.session = session
+
+    async def insert_scans(
+        self, user_id: uuid.UUID, scans: list[dict], known_since: datetime
+    ) -> dict[uuid.UUID, bool]:
+        """
+        Многострочная вставка сканирований одним запросом. Скан пишется, только если метка с его
+        nfc_uid сейчас привязана к object_id; nfc_id берется из object_nfc, а не из кэша
+        (uid могли перерегистрировать с новым id). Скан с id, уже записанным начиная с known_since,
+        пропускается даже с другим временем: PK партиционированной таблицы - (id, created_at),
+        и ON CONFLICT ловит только повтор с тем же временем.
+        Возвращает id сканов с действующей меткой -> добавлен ли скан (False - дубль).
+        """
+        if not scans:
+            return {}
+
+        rows = values(
+            column("id", UUID),
+            column("nfc_uid", ObjectNFC.nfc_uid.type),
+            column("object_id", UUID),
+            column("created_at", TIMESTAMP(timezone=True)),
+            name="scans",
+        ).data([(scan["id"], scan["nfc_uid"], scan["object_id"], scan["created_at"]) for scan in scans])
+
+        valid = (
+            select(rows.c.id, ObjectNFC.id.label("nfc_id"), rows.c.created_at)
+            .join(ObjectNFC, (ObjectNFC.nfc_uid == rows.c.nfc_uid) & (ObjectNFC.object_id == rows.c.object_id))
+            .cte("valid")
+        )
+        written = aliased(HistoryObjectNFC)
+        inserted = (
+            insert(HistoryObjectNFC)
+            .from_select(
+                ["id", "nfc_id", "user_id", "created_at"],
+                select(valid.c.id, valid.c.nfc_id, literal(user_id, UUID), valid.c.created_at)
+                # по PK (id, created_at); created_at отсекает старые партиции
+                .where(~exists().where(written.id == valid.c.id, written.created_at >= known_since)),
+            )
+            .on_conflict_do_nothing()
+            .returning(HistoryObjectNFC.id)
+            .cte("inserted")
+        )
+        stmt = (
+            select(valid.c.id, inserted.c.id.is_not(None).label("inserted"))
+            .join(inserted, inserted.c.id == valid.c.id, isouter=True)
+        )
+        result = await self.session.execute(stmt)
+        return dict(result.tuples().all())
+
+    async def ensure_partitions(self, months_ahead: int, since: datetime | None = None) -> None:
+        """Создать недостающие месячные партиции с месяца since (по умолчанию текущего) до текущего + months_ahead"""
+        args = (months_ahead, since) if since else (months_ahead,)
+        await self.session.execute(select(func.history_object_nfc_ensure_partitions(*args)))
+
+    async def partitions(self) -> dict[date, str]:
+        """Подключенные партиции: первый день месяца -> имя таблицы"""
+        stmt = text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'history_object_nfc'::regclass"
+        )
+        result = await self.session.execute(stmt)
+
+        partitions = {}
+        for name in result.scalars():
+            match = self.partition_name.match(name)
+            if match:
+                partitions[date(int(match[1]), int(match[2]), 1)] = name
+        return dict(sorted(partitions.items()))
+
+    async def archive_partitions(self, before: date, archive_schema: str | None) -> list[str]:
+        """
+        Отсоединить партиции месяцев раньше before: перенести в archive_schema
+        или удалить, если схема не задана. Данные не переписываются, только DDL.
+        """
+        archived = []
+        for month, name in (await self.partitions()).items():
+            if month >= before:
+                break
+            # имя пришло из каталога и проверено регуляркой partition_name
+            await self.session.execute(text(f'ALTER TABLE history_object_nfc DETACH PARTITION "{name}"'))
+            if archive_schema:
+                await self.session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+                await self.session.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+            else:
+                await self.session.execute(text(f'DROP TABLE "{name}"'))
+            archived.append(name)
+        return archived
+
+    async def archive_default_rows(self, before: date, archive_schema: str | None) -> int:
+        """
+        Строки DEFAULT-партиции раньше before (сканы за месяцы без своей партиции): перенести
+        в archive_schema.history_object_nfc_default или удалить. Возвращает число строк.
+        """
+        if not await self.session.scalar(select(func.to_regclass(self.default_partition))):
+            return 0
+
+        columns = [c.name for c in HistoryObjectNFC.__table__.columns]
+        default = self._history_table(self.default_partition)
+        stmt = delete(default).where(default.c.created_at < datetime.combine(before, time(), UTC))
+        if archive_schema:
+            await self.session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            await self.session.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{archive_schema}".{self.default_partition} '
+                "(LIKE history_object_nfc INCLUDING DEFAULTS)"
+            ))
+            moved = stmt.returning(*default.c).cte("moved")
+            archive = self._history_table(self.default_partition, archive_schema)
+            stmt = insert(archive).from_select(columns, select(*(moved.c[name] for name in columns)))
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    @staticmethod
+    def _history_table(name: str, schema: str | None = None):
+        """Таблица с колонками history_object_nfc (партиция или ее копия в архиве), которой нет в моделях"""
+        return table(name, *(column(c.name, c.type) for c in HistoryObjectNFC.__table__.columns), schema=schema)
@@ -1,16 +1,24 @@
 import uuid
 
-from shapely import wkb
-from sqlalchemy import func, select
+from sqlalchemy import JSON, String, cast, exists, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm import joinedload
 
-from app.models.enums import ObjectTypeEnum, ObjectTypeFilter, UserRoleEnum
+from app.config.main import settings
+from app.models.company import Company
+from app.models.enums import GeometryFormatEnum, ObjectTypeFilter, UserRoleEnum
+from app.models.nfc import ObjectNFC
 from app.models.objects import Acts, CheckList, CheckListDocument, Objects, ObjectsCategories
 from app.models.users import User
 from app.repositories.base import SQLAlchemyRepository
-from app.schemas.objects import SObjectDetail
+from app.schemas.company import ResponsibleUserSub
+from app.schemas.geometry import BBox, GeometryOptions
+from app.schemas.objects import SActObjectSub, SCheckListSub, SObjectByPoint, SObjectDetail, SObjectsList
 from app.schemas.users import SUserCurrentSubObject
+from app.utils.create_geom import as_geography, coords_from_wkb, geography_point
+from app.utils.geofence import GeofenceIndex
+
+geofence_index = GeofenceIndex(ttl=settings.GEOFENCE_INDEX_TTL_SECONDS)
 
 
 class CheckListRepository(SQLAlchemyRepository):
@@ -26,21 +34,24 @@ class ActsRepository(SQLAlchemyRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
         
-    async def get_check_list_detail(self, object_id: uuid.UUID) -> CheckList | None:
+    async def get_check_list_detail(self, object_id: uuid.UUID):
+        """Чек-лист объекта вместе с ФИО ответственного и подрядчиком; None - если нет объекта"""
         stmt = (
-            select(CheckList)
-            .options(
-                selectinload(CheckList.documents),
-                joinedload(CheckList.object)
-                    .joinedload(Objects.responsible_user),
-                joinedload(CheckList.object)
-                    .joinedload(Objects.contractor)
+            select(
+                Objects.id,
+                CheckList,
+                User.fio.label("responsible_fio"),
+                Company.title.label("contractor_title"),
             )
-            .where(CheckList.object_id == object_id)
+            .join(CheckList, CheckList.object_id == Objects.id, isouter=True)
+            .join(User, Objects.responsible_user_id == User.id, isouter=True)
+            .join(Company, Objects.contractor_id == Company.id, isouter=True)
+            .options(joinedload(CheckList.documents))
+            .where(Objects.id == object_id)
         )
 
         result = await self.session.execute(stmt)
-        return result.scalars().first()
+        return result.unique().first()
         
 class CheckListDocumentRepository(SQLAlchemyRepository):
     model = CheckListDocument
@@ -58,26 +69,24 @@ class ObjectsRepository(SQLAlchemyRepository):
         self, 
         filter_by: ObjectTypeFilter, 
         company_id: uuid.UUID,
-        user: User
-        ):
+        user: User,
+        limit: int,
+        cursor: str | None = None
+        ) -> tuple[list[dict], str | None]:
         stmt = (
-            select(Objects)
-            .options(
-                joinedload(Objects.remarks_items),
-                joinedload(Objects.act),
-                joinedload(Objects.check_list),
-                joinedload(Objects.responsible_user),
-                selectinload(Objects.nfc_items)
+            select(
+                *self.project(SObjectsList),
+                Objects.created_at,
+                *self.project(ResponsibleUserSub, User, "responsible_user"),
+                *self.project(SActObjectSub, Acts, "act"),
+                *self.project(SCheckListSub, CheckList, "check_list"),
+                exists().where(ObjectNFC.object_id == Objects.id).label("is_nfc"),
             )
+            .join(User, Objects.responsible_user_id == User.id, isouter=True)
+            .join(Acts, Acts.object_id == Objects.id, isouter=True)
+            .join(CheckList, CheckList.object_id == Objects.id, isouter=True)
         )
-        
-        if user.role != UserRoleEnum.INSPECTIION:
-            if user.role == UserRoleEnum.CONTRACTOR:
-                stmt = stmt.where(
-                    Objects.contractor_id == user.company_id
-                )
-            else:
-                stmt = stmt.where(Objects.company_id == company_id)
+        stmt = self._scoped(stmt, company_id, user)
 
         if filter_by == ObjectTypeFilter.ACTIVE:
             stmt = stmt.where(Objects.object_type == ObjectTypeFilter.ACTIVE)
@@ -88,10 +97,29 @@ class ObjectsRepository(SQLAlchemyRepository):
         elif filter_by == ObjectTypeFilter.ACT_OPENING:
             stmt = stmt.where(Objects.object_type == ObjectTypeFilter.ACT_OPENING)
 
-        result = await self.session.execute(stmt)
-        return result.unique().scalars().all()
+        rows, next_cursor = await self.paginate(
+            stmt, (Objects.created_at, Objects.id), limit, cursor, descending=True
+        )
+        return [self.unflatten(row._mapping) for row in rows], next_cursor
         
-    async def get_object_detail(self, object_id: uuid.UUID):
+    @staticmethod
+    def geometry_column(geometry: GeometryOptions):
+        """Контур объекта в запрошенном формате (label `geometry`)"""
+        geom = Objects.geom
+        if geometry.simplify:
+            geom = func.ST_SimplifyPreserveTopology(geom, geometry.simplify)
+        if geometry.format == GeometryFormatEnum.GEOJSON:
+            return cast(func.ST_AsGeoJSON(geom, geometry.precision), JSON).label("geometry")
+        return geom.label("geometry")
+
+    @staticmethod
+    def decode_geometry(values: list, geometry: GeometryOptions) -> list[dict]:
+        """Значения колонки geometry_column -> поля `coords` и `geometry` схемы"""
+        if geometry.format == GeometryFormatEnum.GEOJSON:
+            return [{"coords": None, "geometry": value} for value in values]
+        return [{"coords": coords, "geometry": None} for coords in coords_from_wkb(values)]
+
+    async def get_object_detail(self, object_id: uuid.UUID, geometry: GeometryOptions):
         query = (
             select(
                 Objects.id,
@@ -105,7 +133,7 @@ class ObjectsRepository(SQLAlchemyRepository):
                 Objects.city,
                 Objects.date_delivery_verification,
                 Objects.start_date,
-                Objects.geom,
+                self.geometry_column(geometry),
                 User.id.label("user_id"),
                 User.using_id.label("user_using_id"),
                 User.avatar,
@@ -122,18 +150,7 @@ class ObjectsRepository(SQLAlchemyRepository):
         if not row:
             return None
 
-        coords = None
-        if row["geom"]:
-            geom_wkb = bytes(row["geom"].data) if hasattr(row["geom"], "data") else row["geom"]
-            shape = wkb.loads(geom_wkb)
-
-            if shape.geom_type == "Polygon":
-                coords = [tuple(coord) for coord in shape.exterior.coords]
-            elif shape.geom_type == "MultiPolygon":
-                coords = [
-                    [tuple(coord) for coord in poly.exterior.coords]
-                    for poly in shape.geoms
-                ]
+        geometry_fields = self.decode_geometry([row["geometry"]], geometry)[0]
 
         return SObjectDetail(
             id=row["id"],
@@ -147,7 +164,7 @@ class ObjectsRepository(SQLAlchemyRepository):
             city=row["city"],
             date_delivery_verification=row["date_delivery_verification"],
             start_date=row["start_date"],
-            coords=coords,
+            **geometry_fields,
             responsible_user=(
                 SUserCurrentSubObject(
                     id=row["user_id"],
@@ -162,39 +179,73 @@ class ObjectsRepository(SQLAlchemyRepository):
             )
         )
         
-    async def count_objects(
-        self, 
-        category_id: uuid.UUID | None, 
-        filter_by: ObjectTypeEnum,
-        company_id: uuid.UUID,
-        user: User
-        ) -> int:
-        query = select(func.count()).select_from(Objects)
-        
-        if user.role != UserRoleEnum.INSPECTIION:
-            if user.role == UserRoleEnum.CONTRACTOR:
-                query.where(
-                    Objects.contractor_id == user.company_id
-                )
-            else:
-                query = query.where(Objects.company_id == company_id)
-        
-        if category_id:
-            query = query.where(Objects.category_id==category_id)
-            
-        if filter_by == ObjectTypeFilter.ACT_OPENING:
-            query = query.where(Objects.object_type == filter_by.value)
-        elif filter_by == ObjectTypeFilter.ACTIVE:
-            query = query.where(Objects.object_type == filter_by.value)
-        elif filter_by == ObjectTypeFilter.NOT_ACTIVE:
-            query = query.where(Objects.object_type == filter_by.value)
-        elif filter_by == ObjectTypeFilter.AGREEMENT:
-            query = query.where(Objects.object_type == filter_by.value)
-            
-        result = await self.session.execute(query)
-        return result.scalar_one()
+    async def count_by_category_and_type(self, company_id: uuid.UUID, user: User):
+        """Количество доступных пользователю объектов по (category_id, object_type) одним запросом"""
+        stmt = (
+            select(Objects.category_id, Objects.object_type, func.count().label("count"))
+            .group_by(Objects.category_id, Objects.object_type)
+        )
+        stmt = self._scoped(stmt, company_id, user)
+
+        result = await self.session.execute(stmt)
+        return result.all()
         
-    async def get_status_projects(self, company_id: uuid.UUID, user: User):
+    @staticmethod
+    def _scoped(stmt, company_id: uuid.UUID, user: User):
+        """Объекты, доступные пользователю: инспекция - все, подрядчик - свои, остальные - компании"""
+        if user.role == UserRoleEnum.INSPECTIION:
+            return stmt
+        if user.role == UserRoleEnum.CONTRACTOR:
+            return stmt.where(Objects.contractor_id == user.company_id)
+        return stmt.where(Objects.company_id == company_id)
+
+    @staticmethod
+    def envelope(bbox: BBox):
+        return func.ST_MakeEnvelope(bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat, 4326)
+
+    async def cluster_objects(
+        self, company_id: uuid.UUID, user: User, bbox: BBox, cell_size: float
+    ) -> list[dict]:
+        """Количество объектов в ячейках сетки `cell_size` градусов внутри bbox"""
+        center = func.ST_PointOnSurface(Objects.geom)
+        stmt = (
+            select(
+                func.count().label("count"),
+                func.avg(func.ST_X(center)).label("lon"),
+                func.avg(func.ST_Y(center)).label("lat"),
+            )
+            .where(func.ST_Intersects(Objects.geom, self.envelope(bbox)))
+            .group_by(
+                func.floor(func.ST_X(center) / cell_size),
+                func.floor(func.ST_Y(center) / cell_size),
+            )
+        )
+        stmt = self._scoped(stmt, company_id, user)
+
+        result = await self.session.execute(stmt)
+        return result.mappings().all()
+
+    async def get_tile(self, z: int, x: int, y: int, user: User) -> bytes:
+        """Векторный тайл (MVT) слоя `objects` с атрибутами id, title, status"""
+        envelope = func.ST_TileEnvelope(z, x, y)
+        tile = (
+            select(
+                func.ST_AsMVTGeom(func.ST_Transform(Objects.geom, 3857), envelope).label("geom"),
+                cast(Objects.id, String).label("id"),
+                Objects.title,
+                cast(Objects.status, String).label("status"),
+            )
+            .where(func.ST_Intersects(Objects.geom, func.ST_Transform(envelope, 4326)))
+        )
+        tile = self._scoped(tile, user.company_id, user).subquery("tile")
+
+        stmt = select(func.ST_AsMVT(literal_column("tile"), "objects", 4096, "geom")).select_from(tile)
+        result = await self.session.execute(stmt)
+        return bytes(result.scalar_one() or b"")
+
+    async def get_status_projects(
+        self, company_id: uuid.UUID, user: User, geometry: GeometryOptions, bbox: BBox | None = None
+    ):
         stmt = (
             select(
                 Objects.id,
@@ -203,47 +254,76 @@ class ObjectsRepository(SQLAlchemyRepository):
                 Objects.updated_at,
                 Objects.status,
                 User.fio.label("responsible_fio"),
-                Objects.geom
+                self.geometry_column(geometry)
             )
             .join(User, Objects.responsible_user_id == User.id, isouter=True)
         )
-        
-        if user.role != UserRoleEnum.INSPECTIION:
-            if user.role == UserRoleEnum.CONTRACTOR:
-                stmt = stmt.where(
-                    Objects.contractor_id == user.company_id
-                ) 
-            else:
-                stmt = stmt.where(Objects.company_id == company_id)
+        stmt = self._scoped(stmt, company_id, user)
+        if bbox:
+            stmt = stmt.where(func.ST_Intersects(Objects.geom, self.envelope(bbox)))
 
         result = await self.session.execute(stmt)
         rows = result.all()
 
-        projects = []
-        for row in rows:
-            coords = None
-            if row.geom:
-                geom_wkb = bytes(row.geom.data) if hasattr(row.geom, "desc") else row.geom
-                shape = wkb.loads(geom_wkb)
-
-                if shape.geom_type == "Polygon":
-                    # просто список кортежей
-                    coords = [tuple(pt) for pt in shape.exterior.coords]
-                elif shape.geom_type == "MultiPolygon":
-                    # список списков кортежей
-                    coords = [[tuple(pt) for pt in poly.exterior.coords] for poly in shape.geoms]
-
-            projects.append({
+        # геометрии всех объектов декодируются одной пачкой
+        all_geometry = self.decode_geometry([row.geometry for row in rows], geometry)
+
+        return [
+            {
                 "id": row.id,
                 "title": row.title,
                 "city": row.city,
                 "status": row.status,
                 "updated_at": row.updated_at,
                 "responsible_user": {"fio": row.responsible_fio} if row.responsible_fio else None,
-                "coords": coords
-            })
+                **geometry_fields
+            }
+            for row, geometry_fields in zip(rows, all_geometry, strict=True)
+        ]
         
-        return projects
+    @staticmethod
+    def geofence(geom: str, category_id: uuid.UUID, radius: int | None = None):
+        """
+        SQL-выражение буфера контура для колонки geofence.
+        Радиус: у объекта -> у категории -> GEOFENCE_RADIUS_METERS
+        """
+        category_radius = (
+            select(ObjectsCategories.geofence_radius)
+            .where(ObjectsCategories.id == category_id)
+            .scalar_subquery()
+        )
+        return func.ST_Buffer(
+            as_geography(func.ST_GeomFromText(geom, 4326)),
+            func.coalesce(radius, category_radius, settings.GEOFENCE_RADIUS_METERS)
+        )
+
+    async def geofences(self) -> list[tuple[uuid.UUID, bytes]]:
+        """WKB geofence всех объектов для GeofenceIndex"""
+        stmt = select(Objects.id, func.ST_AsBinary(Objects.geofence)).where(Objects.geofence.is_not(None))
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def find_by_point(
+        self, lat: float, lon: float, company_id: uuid.UUID, user: User
+    ) -> list[SObjectByPoint]:
+        """Объекты, в geofence которых находится точка"""
+        point = geography_point(lat, lon)
+        distance = func.ST_Distance(as_geography(Objects.geom), point)
+        stmt = select(*self.project(SObjectByPoint), distance.label("distance")).order_by(distance)
+
+        if settings.GEOFENCE_IN_PROCESS:
+            await geofence_index.ensure_loaded(self.geofences)
+            object_ids = geofence_index.objects_at(lat, lon)
+            if not object_ids:
+                return []
+            stmt = stmt.where(Objects.id.in_(object_ids))
+        else:
+            stmt = stmt.where(func.ST_Covers(Objects.geofence, point))
+
+        stmt = self._scoped(stmt, company_id, user)
+
+        result = await self.session.execute(stmt)
+        return [SObjectByPoint.model_validate(dict(row)) for row in result.mappings()]
         
 class ObjectsCategoriesRepository(SQLAlchemyRepository):
     model = ObjectsCategories
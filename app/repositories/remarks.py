@@ -2,7 +2,7 @@ import uuid
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, lazyload, load_only
 
 from app.models.objects import Objects
 from app.models.remarks import RemarkAnswer, RemarkAnswerFile, RemarkPhoto, Remarks, RemarksItem
@@ -44,12 +44,13 @@ class RemarksRepository(SQLAlchemyRepository):
             select(Remarks)
             .options(
                 joinedload(Remarks.items)
-                .joinedload(RemarksItem.photos),
+                .selectinload(RemarksItem.photos),
                 joinedload(Remarks.items)
-                .joinedload(RemarksItem.object),
+                .joinedload(RemarksItem.object)
+                .options(load_only(Objects.title), lazyload("*")),
                 joinedload(Remarks.items)
                 .joinedload(RemarksItem.answer)
-                .joinedload(RemarkAnswer.files)
+                .selectinload(RemarkAnswer.files)
             )
             .where(Remarks.id == remark_id)
         )
@@ -98,7 +99,7 @@ class RemarksRepository(SQLAlchemyRepository):
             ]
         }
         
-    async def get_all_remarks(self, object_id: uuid.UUID):
+    async def get_all_remarks(self, object_id: uuid.UUID, limit: int, cursor: str | None = None):
         stmt = (
             select(
                 Remarks.id,
@@ -121,7 +122,4 @@ class RemarksRepository(SQLAlchemyRepository):
                 )
         )
 
-        stmt = stmt.order_by(Remarks.date_remark.desc())
-
-        result = await self.session.execute(stmt)
-        return result.all()
\ No newline at end of file
+        return await self.paginate(stmt, (Remarks.date_remark, Remarks.id), limit, cursor, descending=True)
\ No newline at end of file
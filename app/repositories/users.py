@@ -1,14 +1,22 @@
 import uuid
+from datetime import datetime
 
-from geoalchemy2 import Geography, Geometry
-from sqlalchemy import func, select, update
+from sqlalchemy import bindparam, func, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.config.main import settings
+from app.models.company import Company
 from app.models.enums import UserRoleEnum
+from app.models.nfc import HistoryObjectNFC, ObjectNFC
 from app.models.objects import Objects
 from app.models.users import RefreshSession, User, UserObjectAccess
 from app.repositories.base import SQLAlchemyRepository
+from app.repositories.objects import ObjectsRepository, geofence_index
+from app.schemas.company import SCompanyCurrent
+from app.schemas.users import SUsersContractor
+from app.utils.create_geom import geography_point
 
 
 class UserObjectAccessRepository(SQLAlchemyRepository):
@@ -17,6 +25,91 @@ class UserObjectAccessRepository(SQLAlchemyRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    async def extend_access(self, user_id: uuid.UUID, expires_by_object: dict[uuid.UUID, datetime]) -> list:
+        """
+        Upsert доступа к нескольким объектам одним запросом.
+        Срок доступа только продлевается: уже выданный более поздний срок не сокращается.
+        """
+        if not expires_by_object:
+            return []
+
+        stmt = insert(UserObjectAccess).values([
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "object_id": object_id,
+                "is_active": True,
+                "access_expires_at": access_expires_at,
+            }
+            for object_id, access_expires_at in expires_by_object.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_object_access_user_id_object_id",
+            set_={
+                "is_active": True,
+                "access_expires_at": func.greatest(UserObjectAccess.access_expires_at, stmt.excluded.access_expires_at),
+            },
+        ).returning(UserObjectAccess.object_id, UserObjectAccess.access_expires_at)
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def grant_by_nfc(
+        self, user_id: uuid.UUID, object_id: uuid.UUID, nfc_uid: str, access_expires_at: datetime
+    ) -> datetime | None:
+        """
+        Upsert доступа и запись в историю одним запросом. Метка ищется по (nfc_uid, object_id),
+        а не по id из кэша: uid могли перерегистрировать на том же объекте с новым id.
+        None - метки с этим uid у объекта нет, ничего не записано.
+        """
+        tag = (
+            select(ObjectNFC.id)
+            .where(ObjectNFC.nfc_uid == nfc_uid, ObjectNFC.object_id == object_id)
+            .cte("tag")
+        )
+
+        access_insert = insert(UserObjectAccess).from_select(
+            ["id", "user_id", "object_id", "is_active", "access_expires_at", "created_at"],
+            select(
+                bindparam("access_id", uuid.uuid4(), UserObjectAccess.id.type),
+                bindparam("verify_user_id", user_id, UserObjectAccess.user_id.type),
+                bindparam("verify_object_id", object_id, UserObjectAccess.object_id.type),
+                true(),
+                bindparam("verify_expires_at", access_expires_at, UserObjectAccess.access_expires_at.type),
+                func.now(),
+            ).select_from(tag),
+        )
+        access = (
+            access_insert
+            .on_conflict_do_update(
+                constraint="uq_user_object_access_user_id_object_id",
+                set_={
+                    "is_active": True,
+                    "access_expires_at": access_insert.excluded.access_expires_at,
+                },
+            )
+            .returning(UserObjectAccess.access_expires_at)
+            .cte("access")
+        )
+
+        history = (
+            insert(HistoryObjectNFC)
+            .from_select(
+                ["id", "nfc_id", "user_id", "created_at"],
+                select(
+                    bindparam("history_id", uuid.uuid4(), HistoryObjectNFC.id.type),
+                    tag.c.id,
+                    bindparam("verify_user_id"),
+                    func.now(),
+                ),
+            )
+            .cte("history")
+        )
+
+        # history не участвует в выборке, add_cte нужен, чтобы CTE попал в запрос
+        stmt = select(access.c.access_expires_at).add_cte(history)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
 class UsersRepository(SQLAlchemyRepository):
     model = User
 
@@ -33,14 +126,17 @@ class UsersRepository(SQLAlchemyRepository):
         result = await self.session.execute(stmt)
         return result.unique().scalar_one()
         
-    async def find_all_contractors(self):
+    async def find_all_contractors(self, limit: int, cursor: str | None = None) -> tuple[list[dict], str | None]:
         query = (
-            select(User)
-            .options(joinedload(User.company))
+            select(
+                *self.project(SUsersContractor),
+                *self.project(SCompanyCurrent, Company, "company"),
+            )
+            .join(Company, User.company_id == Company.id, isouter=True)
             .where(User.role == UserRoleEnum.CONTRACTOR)
         )
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        rows, next_cursor = await self.paginate(query, (User.fio, User.id), limit, cursor)
+        return [self.unflatten(row._mapping) for row in rows], next_cursor
         
     async def get_users_by_ids(self, user_ids: list[uuid.UUID]):
         if not user_ids:
@@ -51,16 +147,17 @@ class UsersRepository(SQLAlchemyRepository):
         return result.scalars().all()
         
     async def validate_coords(self, object_id: str, lat: float, lon: float) -> bool:
+        if settings.GEOFENCE_IN_PROCESS:
+            await geofence_index.ensure_loaded(ObjectsRepository(self.session).geofences)
+            allowed = geofence_index.covers(object_id, lat, lon)
+            if allowed is not None:
+                return allowed
+
+        # geofence - контур объекта, заранее расширенный на допустимую погрешность
         stmt = (
-            select(
-                func.ST_Contains(
-                    func.cast(func.ST_Buffer(func.cast(Objects.geom, Geography), 200), Geometry),
-                    func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
-                ).label("allowed")
-            )
+            select(func.ST_Covers(Objects.geofence, geography_point(lat, lon)).label("allowed"))
             .where(Objects.id == object_id)
         )
-        # допускаем погрешность в 200м
         result = await self.session.execute(stmt)
         allowed = result.scalar()
         return bool(allowed)
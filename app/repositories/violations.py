@@ -2,7 +2,7 @@ import uuid
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, lazyload, load_only
 
 from app.models.objects import Objects
 from app.models.violations import ViolationAnswer, ViolationAnswerFile, ViolationPhoto, Violations, ViolationsItem
@@ -44,12 +44,13 @@ class ViolationsRepository(SQLAlchemyRepository):
             select(Violations)
             .options(
                 joinedload(Violations.items)
-                .joinedload(ViolationsItem.photos),
+                .selectinload(ViolationsItem.photos),
                 joinedload(Violations.items)
-                .joinedload(ViolationsItem.object),
+                .joinedload(ViolationsItem.object)
+                .options(load_only(Objects.title), lazyload("*")),
                 joinedload(Violations.items)
                 .joinedload(ViolationsItem.answer)
-                .joinedload(ViolationAnswer.files)
+                .selectinload(ViolationAnswer.files)
             )
             .where(Violations.id == violation_id)
         )
@@ -98,7 +99,7 @@ class ViolationsRepository(SQLAlchemyRepository):
             ]
         }
         
-    async def get_all_violations(self, object_id: uuid.UUID):
+    async def get_all_violations(self, object_id: uuid.UUID, limit: int, cursor: str | None = None):
         stmt = (
             select(
                 Violations.id,
@@ -121,7 +122,4 @@ class ViolationsRepository(SQLAlchemyRepository):
                 )
         )
 
-        stmt = stmt.order_by(Violations.date_violation.desc())
-
-        result = await self.session.execute(stmt)
-        return result.all()
\ No newline at end of file
+        return await self.paginate(stmt, (Violations.date_violation, Violations.id), limit, cursor, descending=True)
\ No newline at end of file
@@ -13,6 +13,11 @@ class SuccessResponseModel(BaseModel, Generic[T]):
     status: Literal["success"]
     code: int
     data: T
+    next_cursor: str | None = None
+
+class PageModel(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
 
 class ErrorEnvelopeModel(BaseModel):
     status: Literal["error"]
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, ConfigDict
 
@@ -24,6 +25,7 @@ class SCompanyProjectStatuses(BaseModel):
     updated_at: datetime
     status: ObjectStatusesEnum
     responsible_user: ResponsibleUserSub | None
-    coords: list[tuple[float, float]] | list[list[tuple[float, float]]]
+    coords: list[tuple[float, float]] | list[list[tuple[float, float]]] | None = None
+    geometry: dict[str, Any] | None = None
     
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
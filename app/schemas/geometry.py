@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from app.models.enums import GeometryFormatEnum
+
+
+class GeometryOptions(BaseModel):
+    """Как отдавать контуры объектов: формат, допуск упрощения и точность GeoJSON"""
+    format: GeometryFormatEnum = GeometryFormatEnum.COORDS
+    simplify: float | None = None
+    precision: int
+
+
+class BBox(BaseModel):
+    """Прямоугольник карты в градусах (EPSG:4326)"""
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
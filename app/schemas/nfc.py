@@ -1,7 +1,9 @@
 import uuid
 from datetime import date, datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field
+
+from app.config.main import settings
 
 
 class SNFCCreate(BaseModel):
@@ -70,4 +72,29 @@ class SNFCHistoryObjectList(BaseModel):
 class SNFCChange(BaseModel):
     label: str
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SNFCScan(BaseModel):
+    id: uuid.UUID = Field(description="id скана, сгенерированный устройством (повтор не создает дубль)")
+    object_id: uuid.UUID
+    nfc_uid: str
+    scanned_at: AwareDatetime
+
+
+class SNFCSync(BaseModel):
+    scans: list[SNFCScan] = Field(min_length=1, max_length=settings.NFC_SYNC_MAX_SCANS)
+
+
+class SNFCSyncAccess(BaseModel):
+    object_id: uuid.UUID
+    access_expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SNFCSyncResult(BaseModel):
+    accepted: list[uuid.UUID]
+    duplicates: list[uuid.UUID]
+    rejected: list[uuid.UUID]
+    access: list[SNFCSyncAccess]
@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.enums import ActStatusEnum, CheckListStatusEnum, DocumentStatusEnum, ObjectStatusesEnum, ObjectTypeEnum
-from app.schemas.company import ResponsibleUserSub
+from app.schemas.company import ResponsibleUserSub, SCompanyProjectStatuses
 from app.schemas.users import SUserCurrentSubObject
 
 
@@ -33,6 +34,7 @@ class SObjectCreate(BaseModel):
     date_delivery_verification: datetime
     start_date: datetime
     coords: list[tuple[float, float]] | list[list[tuple[float, float]]]
+    geofence_radius: int | None = Field(None, gt=0, description="Допуск гео в метрах, по умолчанию - из категории")
     
     model_config = ConfigDict(from_attributes=True)
     
@@ -74,7 +76,8 @@ class SObjectDetail(BaseModel):
     city: str
     date_delivery_verification: datetime
     start_date: datetime
-    coords: list[tuple[float, float]] | list[list[tuple[float, float]]]
+    coords: list[tuple[float, float]] | list[list[tuple[float, float]]] | None = None
+    geometry: dict[str, Any] | None = None
     responsible_user: SUserCurrentSubObject | None
     
     model_config = ConfigDict(from_attributes=True)   
@@ -83,6 +86,15 @@ class SCountObjects(BaseModel):
     count: int
     
     model_config = ConfigDict(from_attributes=True)
+
+class SObjectsCounters(BaseModel):
+    all: int
+    active: int
+    not_active: int
+    agreement: int
+    act_opening: int
+    
+    model_config = ConfigDict(from_attributes=True)
     
 class SCategoriesObjects(BaseModel):
     id: uuid.UUID
@@ -163,4 +175,24 @@ class SCheckListSuccessCreated(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
 class SObjectGEOCheck(BaseModel):
-    result: str
\ No newline at end of file
+    result: str
+    
+class SObjectByPoint(BaseModel):
+    id: uuid.UUID
+    using_id: str
+    title: str
+    city: str
+    distance: float
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+class SObjectsCluster(BaseModel):
+    lon: float
+    lat: float
+    count: int
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+class SObjectsViewport(BaseModel):
+    clusters: list[SObjectsCluster] | None = None
+    objects: list[SCompanyProjectStatuses] | None = None
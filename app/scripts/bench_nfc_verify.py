@@ -0,0 +1,132 @@
+"""
+Бенчмарк /nfc/verify при одновременных сканированиях: задержка NFCService.verify_nfc
+с холодным кэшем меток (кэш сбрасывается перед каждым сканом, метка читается из БД)
+и с прогретым.
+
+Каждый скан делает отдельный пользователь в своем UnitOfWork, как параллельные запросы.
+Скан пишет историю и доступ, поэтому данные коммитятся и в конце удаляются:
+
+    python -m app.scripts.bench_nfc_verify --taps 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, insert
+
+import app.api.routers  # noqa: F401  (регистрирует все модели для мапперов)
+from app.config.database import async_session_maker
+from app.dependencies.unitofwork import UnitOfWork
+from app.models.company import Company
+from app.models.enums import ObjectStatusesEnum, ObjectTypeEnum, UserRoleEnum
+from app.models.nfc import ObjectNFC
+from app.models.objects import Objects, ObjectsCategories
+from app.models.users import User
+from app.schemas.nfc import SNFCCreate
+from app.services.nfc import NFCService, nfc_tag_cache
+
+logger = logging.getLogger("app.bench_nfc_verify")
+
+
+async def seed(users: int) -> tuple[uuid.UUID, uuid.UUID, uuid.UUID, str, list[User]]:
+    """Компания с объектом, меткой и пользователями-инспекторами"""
+    now = datetime.now(UTC)
+    company_id, category_id, object_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    nfc_uid = f"bench-{uuid.uuid4()}"
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "using_id": n,
+            "fio": f"bench {n}",
+            "email": f"bench-{uuid.uuid4()}@bench.local",
+            "password": "",
+            "role": UserRoleEnum.INSPECTIION,
+            "company_id": company_id,
+        }
+        for n in range(users)
+    ]
+
+    async with async_session_maker() as session:
+        await session.execute(insert(Company).values(id=company_id, title="bench"))
+        await session.execute(insert(ObjectsCategories).values(id=category_id, title="bench"))
+        await session.execute(insert(Objects).values(
+            id=object_id,
+            using_id=f"bench-{object_id}",
+            company_id=company_id,
+            category_id=category_id,
+            general_info="",
+            title="bench",
+            city="bench",
+            date_delivery_verification=now,
+            start_date=now,
+            status=ObjectStatusesEnum.PLAN,
+            object_type=ObjectTypeEnum.ACTIVE,
+            geom="SRID=4326;POLYGON((37 55,37.001 55,37.001 55.001,37 55))",
+        ))
+        await session.execute(insert(ObjectNFC).values(nfc_uid=nfc_uid, object_id=object_id, label="A"))
+        await session.execute(insert(User), rows)
+        await session.commit()
+    return company_id, category_id, object_id, nfc_uid, [User(**row) for row in rows]
+
+
+async def cleanup(company_id: uuid.UUID, category_id: uuid.UUID) -> None:
+    # объект, метка, история и доступы удаляются каскадом
+    async with async_session_maker() as session:
+        await session.execute(delete(User).where(User.company_id == company_id))
+        await session.execute(delete(Company).where(Company.id == company_id))
+        await session.execute(delete(ObjectsCategories).where(ObjectsCategories.id == category_id))
+        await session.commit()
+
+
+async def measure(
+    name: str, object_id: uuid.UUID, nfc_uid: str, users: list[User], taps: int, concurrency: int, cold: bool
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def tap(user: User) -> None:
+        async with semaphore:
+            if cold:
+                nfc_tag_cache.clear()
+            started = time.perf_counter()
+            await NFCService().verify_nfc(UnitOfWork(), SNFCCreate(nfc_uid=nfc_uid), user, object_id)
+            timings.append(time.perf_counter() - started)
+
+    nfc_tag_cache.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(tap(users[n % len(users)]) for n in range(taps)))
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = (statistics.quantiles(timings, n=100)[q - 1] * 1000 for q in (50, 95, 99))
+    logger.info(
+        "%-6s taps=%s concurrency=%s  p50=%.1f ms  p95=%.1f ms  p99=%.1f ms  %.0f taps/s",
+        name, taps, concurrency, p50, p95, p99, taps / elapsed,
+    )
+
+
+async def run(taps: int, concurrency: int, users: int) -> None:
+    company_id, category_id, object_id, nfc_uid, seeded = await seed(users)
+    try:
+        await measure("cold", object_id, nfc_uid, seeded, taps, concurrency, cold=True)
+        await measure("warm", object_id, nfc_uid, seeded, taps, concurrency, cold=False)
+    finally:
+        await cleanup(company_id, category_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк проверки NFC-метки при одновременных сканированиях")
+    parser.add_argument("--taps", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    asyncio.run(run(args.taps, args.concurrency, args.users))
+
+
+if __name__ == "__main__":
+    main()
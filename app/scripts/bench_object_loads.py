@@ -0,0 +1,205 @@
+"""
+Бенчмарк загрузки списка объектов и детального замечания на объектах с большим числом замечаний.
+
+Сравнивает текущие запросы репозиториев с прежней стратегией (joinedload коллекций) на одной
+и той же странице списка: время (медиана повторов), число SQL-запросов и число строк, которые отдает БД.
+Данные засеваются в транзакции, которая в конце откатывается:
+
+    python -m app.scripts.bench_object_loads --objects 200 --items-per-object 50
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+import app.api.routers  # noqa: F401  (регистрирует все модели для мапперов)
+from app.config.database import engine
+from app.models.company import Company
+from app.models.enums import ObjectStatusesEnum, ObjectTypeEnum, ObjectTypeFilter, RemarkStatusEnum, UserRoleEnum
+from app.models.objects import Objects, ObjectsCategories
+from app.models.remarks import RemarkAnswer, RemarkAnswerFile, RemarkPhoto, Remarks, RemarksItem
+from app.repositories.objects import ObjectsRepository
+from app.repositories.remarks import RemarksRepository
+from app.utils.query_stats import instrument_engine, reset_query_stats, start_query_stats
+
+logger = logging.getLogger("app.bench_object_loads")
+
+
+async def seed(session: AsyncSession, objects: int, items_per_object: int, photos: int, files: int):
+    """Компания с объектами; у каждого объекта items_per_object пунктов замечаний с фото и ответом"""
+    now = datetime.now(UTC)
+    company_id, category_id = uuid.uuid4(), uuid.uuid4()
+    await session.execute(insert(Company).values(id=company_id, title="bench"))
+    await session.execute(insert(ObjectsCategories).values(id=category_id, title="bench"))
+
+    object_ids = [uuid.uuid4() for _ in range(objects)]
+    await session.execute(insert(Objects), [
+        {
+            "id": object_id,
+            "using_id": f"bench-{object_id}",
+            "company_id": company_id,
+            "category_id": category_id,
+            "general_info": "",
+            "title": f"object {n}",
+            "city": "bench",
+            "date_delivery_verification": now,
+            "start_date": now,
+            "status": random.choice(list(ObjectStatusesEnum)),  # noqa: S311
+            "object_type": random.choice(list(ObjectTypeEnum)),  # noqa: S311
+            "geom": "SRID=4326;POLYGON((37 55,37.001 55,37.001 55.001,37 55))",
+        }
+        for n, object_id in enumerate(object_ids)
+    ])
+
+    remark_ids = [uuid.uuid4() for _ in object_ids]
+    await session.execute(insert(Remarks), [
+        {"id": remark_id, "date_remark": now, "expiration_date": now, "status": RemarkStatusEnum.NOT_FIXED}
+        for remark_id in remark_ids
+    ])
+
+    items, item_photos, answers, answer_files = [], [], [], []
+    for object_id, remark_id in zip(object_ids, remark_ids, strict=True):
+        for _ in range(items_per_object):
+            item_id, answer_id = uuid.uuid4(), uuid.uuid4()
+            items.append({
+                "id": item_id,
+                "violations": "",
+                "name_regulatory_docx": "",
+                "object_id": object_id,
+                "date_remark": now,
+                "expiration_date": now,
+                "status": RemarkStatusEnum.NOT_FIXED,
+                "remarks_id": remark_id,
+            })
+            item_photos += [{"remark_item_id": item_id, "file_path": "bench.jpg"} for _ in range(photos)]
+            answers.append({"id": answer_id, "remark_item_id": item_id})
+            answer_files += [{"answer_id": answer_id, "file_path": "bench.pdf"} for _ in range(files)]
+
+    await session.execute(insert(RemarksItem), items)
+    await session.execute(insert(RemarkPhoto), item_photos)
+    await session.execute(insert(RemarkAnswer), answers)
+    await session.execute(insert(RemarkAnswerFile), answer_files)
+    await session.flush()
+    return company_id, remark_ids[0]
+
+
+async def measure(
+    session: AsyncSession, name: str, db_rows: int, call: Callable[[], Awaitable], repeat: int
+) -> None:
+    timings, queries = [], 0
+    for _ in range(repeat):
+        # без identity map с прошлого повтора, иначе уже загруженные коллекции не грузятся заново
+        session.expunge_all()
+        stats, token = start_query_stats()
+        started = time.perf_counter()
+        try:
+            await call()
+        finally:
+            reset_query_stats(token)
+        timings.append(time.perf_counter() - started)
+        queries = stats.count
+    logger.info(
+        "%-28s %8.1f ms  queries=%-3s db_rows=%s", name, statistics.median(timings) * 1000, queries, db_rows
+    )
+
+
+async def run(objects: int, items_per_object: int, photos: int, files: int, limit: int, repeat: int) -> None:
+    instrument_engine(engine)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn)
+        try:
+            company_id, remark_id = await seed(session, objects, items_per_object, photos, files)
+            user = SimpleNamespace(role=UserRoleEnum.CONSTRUCTION_CONTROL, company_id=company_id)
+
+            async def legacy_list():
+                # стратегия до проекции: коллекция remarks_items через JOIN, строки объекта размножаются
+                stmt = (
+                    select(Objects)
+                    .options(
+                        joinedload(Objects.remarks_items),
+                        joinedload(Objects.act),
+                        joinedload(Objects.check_list),
+                        joinedload(Objects.responsible_user),
+                    )
+                    .where(Objects.company_id == company_id)
+                    # та же страница, что у проекции (paginate берет limit + 1); с joinedload коллекции
+                    # SQLAlchemy ограничивает объекты в подзапросе, а JOIN размножает строки уже страницы
+                    .order_by(Objects.created_at.desc(), Objects.id.desc())
+                    .limit(limit + 1)
+                )
+                result = await session.execute(stmt)
+                return result.unique().scalars().all()
+
+            async def legacy_detail():
+                stmt = (
+                    select(Remarks)
+                    .options(
+                        joinedload(Remarks.items).joinedload(RemarksItem.photos),
+                        joinedload(Remarks.items).joinedload(RemarksItem.object),
+                        joinedload(Remarks.items).joinedload(RemarksItem.answer).joinedload(RemarkAnswer.files),
+                    )
+                    .where(Remarks.id == remark_id)
+                )
+                result = await session.execute(stmt)
+                return result.unique().scalar_one_or_none()
+
+            page = (
+                select(Objects.id)
+                .where(Objects.company_id == company_id)
+                .order_by(Objects.created_at.desc(), Objects.id.desc())
+                .limit(limit + 1)
+                .subquery()
+            )
+            object_rows = await session.scalar(
+                select(func.count()).select_from(page)
+                .join(RemarksItem, RemarksItem.object_id == page.c.id, isouter=True)
+            )
+            # пункт x фото x файлы ответа - декартово произведение соседних коллекций
+            detail_rows = items_per_object * max(photos, 1) * max(files, 1)
+
+            await measure(
+                session, "objects list (projection)", min(limit + 1, objects),
+                lambda: ObjectsRepository(session).get_all_objects_by_filter(
+                    ObjectTypeFilter.ALL, company_id, user, limit
+                ),
+                repeat,
+            )
+            await measure(session, "objects list (joinedload)", object_rows, legacy_list, repeat)
+            await measure(
+                session, "remark detail (selectinload)", items_per_object * (1 + photos + files),
+                lambda: RemarksRepository(session).get_remarks_detail(remark_id),
+                repeat,
+            )
+            await measure(session, "remark detail (joinedload)", detail_rows, legacy_detail, repeat)
+        finally:
+            await transaction.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки объектов с большим числом замечаний")
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--items-per-object", type=int, default=50)
+    parser.add_argument("--photos", type=int, default=5)
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    asyncio.run(run(args.objects, args.items_per_object, args.photos, args.files, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
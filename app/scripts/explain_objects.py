@@ -0,0 +1,150 @@
+"""
+Проверка, что запросы списка объектов, счетчиков и дашборда идут по индексам.
+
+Данные засеваются в транзакции, которая в конце откатывается, поэтому скрипт
+можно запускать на любой БД с актуальными миграциями:
+
+    python -m app.scripts.explain_objects --objects 20000
+
+Код выхода 1, если в плане какого-то запроса есть Seq Scan по objects.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+import app.api.routers  # noqa: F401  (регистрирует все модели для мапперов)
+from app.config.database import engine
+from app.models.company import Company
+from app.models.enums import GeometryFormatEnum, ObjectStatusesEnum, ObjectTypeEnum, ObjectTypeFilter, UserRoleEnum
+from app.models.objects import Objects, ObjectsCategories
+from app.repositories.objects import ObjectsRepository
+from app.schemas.geometry import GeometryOptions
+
+logger = logging.getLogger("app.explain_objects")
+
+
+async def seed(session: AsyncSession, objects: int, companies: int, categories: int) -> tuple[list, list]:
+    company_ids = [uuid.uuid4() for _ in range(companies)]
+    category_ids = [uuid.uuid4() for _ in range(categories)]
+    await session.execute(insert(Company), [{"id": i, "title": f"explain {i}"} for i in company_ids])
+    await session.execute(insert(ObjectsCategories), [{"id": i, "title": f"explain {i}"} for i in category_ids])
+
+    now = datetime.now(UTC)
+    rows = []
+    for n in range(objects):
+        lon, lat = 37 + random.random(), 55 + random.random()  # noqa: S311
+        rows.append({
+            "id": uuid.uuid4(),
+            "using_id": f"explain-{n}",
+            "company_id": random.choice(company_ids),  # noqa: S311
+            "contractor_id": random.choice(company_ids),  # noqa: S311
+            "category_id": random.choice(category_ids),  # noqa: S311
+            "general_info": "",
+            "title": f"object {n}",
+            "city": "explain",
+            "date_delivery_verification": now,
+            "start_date": now,
+            "status": random.choice(list(ObjectStatusesEnum)),  # noqa: S311
+            "object_type": random.choice(list(ObjectTypeEnum)),  # noqa: S311
+            "geom": f"SRID=4326;POLYGON(({lon} {lat},{lon + 0.001} {lat},{lon + 0.001} {lat + 0.001},{lon} {lat}))",
+            "created_at": now - timedelta(minutes=n),
+        })
+    await session.execute(insert(Objects), rows)
+    await session.flush()
+    return company_ids, category_ids
+
+
+def scans(plan: dict, relation: str) -> list[str]:
+    """Типы узлов плана, читающих relation"""
+    found = [plan["Node Type"]] if plan.get("Relation Name") == relation else []
+    for child in plan.get("Plans", []):
+        found += scans(child, relation)
+    return found
+
+
+async def explain(conn: AsyncConnection, statements: list[tuple[str, tuple]]) -> list[list[str]]:
+    plans = []
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        plans.append(scans(plan[0]["Plan"], Objects.__tablename__))
+    return plans
+
+
+async def run(objects: int, companies: int, categories: int) -> bool:
+    captured: list[tuple[str, tuple]] = []
+    capturing = False
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing:
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        session = AsyncSession(bind=conn)
+        repository = ObjectsRepository(session)
+        try:
+            company_ids, _ = await seed(session, objects, companies, categories)
+            await conn.execute(text("ANALYZE objects"))
+
+            company_id = company_ids[0]
+            roles = {
+                "company": SimpleNamespace(role=UserRoleEnum.CONSTRUCTION_CONTROL, company_id=company_id),
+                "contractor": SimpleNamespace(role=UserRoleEnum.CONTRACTOR, company_id=company_id),
+            }
+            geometry = GeometryOptions(format=GeometryFormatEnum.COORDS, precision=6)
+
+            ok = True
+            for role, user in roles.items():
+                cases = {
+                    "get_all_objects_by_filter": lambda: repository.get_all_objects_by_filter(
+                        ObjectTypeFilter.ACTIVE, company_id, user, 50
+                    ),
+                    "get_all_objects_by_filter(all)": lambda: repository.get_all_objects_by_filter(
+                        ObjectTypeFilter.ALL, company_id, user, 50
+                    ),
+                    "count_by_category_and_type": lambda: repository.count_by_category_and_type(company_id, user),
+                    "get_status_projects": lambda: repository.get_status_projects(company_id, user, geometry),
+                }
+                for name, query in cases.items():
+                    captured.clear()
+                    capturing = True
+                    await query()
+                    capturing = False
+
+                    for nodes in await explain(conn, captured):
+                        passed = bool(nodes) and "Seq Scan" not in nodes
+                        ok = ok and passed
+                        logger.info("%s %s [%s]: %s", "OK  " if passed else "FAIL", name, role, ", ".join(nodes))
+            return ok
+        finally:
+            await transaction.rollback()
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN запросов списка объектов на засеянных данных")
+    parser.add_argument("--objects", type=int, default=20000)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--categories", type=int, default=8)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    ok = asyncio.run(run(args.objects, args.companies, args.categories))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import logging
+
+from app.config.main import settings
+from app.dependencies.unitofwork import UnitOfWork
+from app.services.history_nfc import HistoryNFCService
+
+logger = logging.getLogger("app.history_nfc")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Обслуживание партиций history_object_nfc")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser("ensure", help="создать партиции наперед")
+    ensure.add_argument("--months-ahead", type=int, default=settings.HISTORY_NFC_PARTITIONS_AHEAD)
+
+    archive = commands.add_parser("archive", help="отсоединить партиции старше срока хранения")
+    archive.add_argument("--retention-months", type=int, default=settings.HISTORY_NFC_RETENTION_MONTHS)
+    archive.add_argument("--schema", default=settings.HISTORY_NFC_ARCHIVE_SCHEMA)
+    archive.add_argument("--drop", action="store_true", help="удалить партиции вместо переноса в схему архива")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "ensure":
+        asyncio.run(HistoryNFCService().ensure_partitions(UnitOfWork(), args.months_ahead))
+        logger.info("history_object_nfc: партиции созданы на %s мес. вперед", args.months_ahead)
+    else:
+        archived, default_rows = asyncio.run(HistoryNFCService().archive(
+            UnitOfWork(), args.retention_months, None if args.drop else args.schema
+        ))
+        logger.info("history_object_nfc: отсоединено %s партиций: %s", len(archived), ", ".join(archived) or "-")
+        logger.info("history_object_nfc_default: убрано %s строк старше срока хранения", default_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from app.exceptions.company import CompanyNotFoundExc
 from app.models.company import Company
 from app.models.users import User
 from app.schemas.company import SCompanyCurrent, SCompanyProjectStatuses
+from app.schemas.geometry import GeometryOptions
 
 
 class CompanyService:
@@ -22,12 +23,13 @@ class CompanyService:
         self, 
         uow: UnitOfWork, 
         company_id: uuid.UUID, 
-        user: User
+        user: User,
+        geometry: GeometryOptions
         ) -> list[SCompanyProjectStatuses]:
-        async with uow:
+        async with uow.read_only():
             check_company: Company | None = await uow.company.find_one_or_none(id=company_id)
             if not check_company:
                 raise CompanyNotFoundExc
             
-            projects = await uow.objects.get_status_projects(company_id, user)
+            projects = await uow.objects.get_status_projects(company_id, user, geometry)
             return [SCompanyProjectStatuses.model_validate(p) for p in projects]
\ No newline at end of file
@@ -8,7 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.dependencies.unitofwork import UnitOfWork
-from app.models.control_materials import ListOfWorks, ProgressWork, StageProgressWork, StageProgressWorkPhoto
+from app.models.control_materials import ListOfWorks, ProgressWork, StageProgressWork
 from app.models.enums import (
     ListOfWorksStatusEnum,
     StageProgressWorkMainStatusEnum,
@@ -16,6 +16,7 @@ from app.models.enums import (
     WorkActionEnum,
 )
 from app.repositories.api import ApiRepository
+from app.schemas.base import PageModel
 from app.schemas.control_materials import (
     SCreateDeliveryWorks,
     SCreateMaterials,
@@ -177,7 +178,7 @@ class MaterialService:
             
             files_map = {file.filename: file for file in files} if files else {}
 
-            photos = []
+            photos: list[str] = []
 
             for key in work_data.photos_keys:
                 upload_file = files_map.get(key)
@@ -187,13 +188,12 @@ class MaterialService:
                     object_name = f"{path_folder}/{uuid.uuid4()}.{ext}"
 
                     url: str = await uow.images.upload_any_file(upload_file, object_name)
+                    photos.append(url)
 
-                    photo = StageProgressWorkPhoto(
-                        list_of_works_id=new_work.id,
-                        file_path=url,
-                    )
-                    uow.session.add(photo)
-                    photos.append(photo)
+            await uow.stage_progress_work_photo.insert_many([
+                {"list_of_works_id": new_work.id, "file_path": url}
+                for url in photos
+            ], returning=False)
                     
             await uow.stage_progress_work.update_by_filter(
                 {
@@ -209,7 +209,7 @@ class MaterialService:
                 status=new_work.status,
                 volume=new_work.volume,
                 desc=new_work.desc,
-                photos=[SPhotosListOfWorks(file_path=p.file_path) for p in photos],
+                photos=[SPhotosListOfWorks(file_path=url) for url in photos],
             )
     
     async def begin_work(self, uow: UnitOfWork, stage_progress_work_id: uuid.UUID) -> SWorkBegin:
@@ -220,10 +220,15 @@ class MaterialService:
             await uow.commit()
             return SWorkBegin.model_validate({"result": "success"})
     
-    async def list_work(self, uow: UnitOfWork, object_id: uuid.UUID) -> list[SMaterialsWorkRead]:
+    async def list_work(
+        self, uow: UnitOfWork, object_id: uuid.UUID, limit: int, cursor: str | None = None
+    ) -> PageModel[SMaterialsWorkRead]:
         async with uow:
-            works = await uow.progress_work.list_work(object_id)
-            return [SMaterialsWorkRead.model_validate(w) for w in works]
+            works, next_cursor = await uow.progress_work.list_work(object_id, limit, cursor)
+            return PageModel[SMaterialsWorkRead](
+                items=[SMaterialsWorkRead.model_validate(w) for w in works],
+                next_cursor=next_cursor
+            )
     
     async def create_work(self, uow: UnitOfWork, object_id: uuid.UUID, user_data: SMaterialsWorkCreate):
         async with uow:
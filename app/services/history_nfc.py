@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from datetime import UTC, date, datetime, timedelta
+
+from app.config.main import settings
+from app.dependencies.unitofwork import UnitOfWork
+
+logger = logging.getLogger("app.history_nfc")
+
+
+def months_ago(months: int) -> date:
+    """Первый день месяца, отстоящего от текущего (UTC) на months"""
+    today = datetime.now(UTC).date()
+    total = today.year * 12 + today.month - 1 - months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+class HistoryNFCService:
+    """Обслуживание месячных партиций history_object_nfc"""
+
+    async def ensure_partitions(
+        self, uow: UnitOfWork, months_ahead: int = settings.HISTORY_NFC_PARTITIONS_AHEAD
+    ) -> None:
+        # партиции нужны и для офлайн-сканов, которые /nfc/sync принимает задним числом
+        since = datetime.now(UTC) - timedelta(days=settings.NFC_SYNC_MAX_AGE_DAYS)
+        async with uow:
+            await uow.history_object_nfc.ensure_partitions(months_ahead, since)
+            await uow.commit()
+
+    async def archive(
+        self, uow: UnitOfWork, retention_months: int, archive_schema: str | None
+    ) -> tuple[list[str], int]:
+        """Отсоединить партиции и убрать строки DEFAULT-партиции старше срока хранения"""
+        before = months_ago(retention_months)
+        async with uow:
+            archived = await uow.history_object_nfc.archive_partitions(before, archive_schema)
+            default_rows = await uow.history_object_nfc.archive_default_rows(before, archive_schema)
+            await uow.commit()
+            return archived, default_rows
+
+
+async def ensure_history_partitions_periodically(
+    interval_hours: int = settings.HISTORY_NFC_ENSURE_INTERVAL_HOURS
+) -> None:
+    """Фоновая задача воркера: досоздавать партиции, даже если приложение месяцами не перезапускается"""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await HistoryNFCService().ensure_partitions(UnitOfWork())
+        except Exception:
+            logger.exception("history_object_nfc: не удалось создать партиции, повтор через %s ч", interval_hours)
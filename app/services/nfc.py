@@ -1,7 +1,9 @@
 import uuid
-from collections import defaultdict
+from collections.abc import Iterable
 from datetime import UTC, datetime, timedelta
 
+from sqlalchemy import Row
+
 from app.config.main import settings
 from app.dependencies.unitofwork import UnitOfWork
 from app.exceptions.nfc import NFCLabelIsExistsExc, NFCNotFoundExc, ObjectNFCUidIsExistsExc
@@ -9,22 +11,51 @@ from app.exceptions.objects import ObjectNotFoundExc, UserObjectSessionNotFoundE
 from app.models.nfc import ObjectNFC
 from app.models.objects import Objects
 from app.models.users import User, UserObjectAccess
+from app.schemas.base import PageModel
 from app.schemas.nfc import (
     SNFCADD,
-    NFCLabelScan,
     SNFCChange,
     SNFCCreate,
     SNFCDelete,
-    SNFCHistoryDate,
     SNFCHistoryObject,
     SNFCHistoryObjectList,
     SNFCSessionTerminate,
+    SNFCSync,
+    SNFCSyncAccess,
+    SNFCSyncResult,
     SNFCVerify,
 )
+from app.utils.cache import TTLCache
 from app.utils.nfc_label import number_to_label_nfc
 
+# Допустимое опережение часов устройства при офлайн-синхронизации
+SCAN_CLOCK_SKEW = timedelta(minutes=5)
+# Метки: nfc_uid -> строка (id, nfc_uid, object_id, label); отсутствующие uid не кэшируются
+nfc_tag_cache = TTLCache(maxsize=settings.NFC_TAG_CACHE_MAX_SIZE, ttl=settings.NFC_TAG_CACHE_TTL_SECONDS)
+
+
+def invalidate_nfc_tag(nfc_uid: str) -> None:
+    """Сбросить метку в кэше воркера (после коммита изменения или по NOTIFY из другого воркера)"""
+    nfc_tag_cache.pop(nfc_uid)
+
 
 class NFCService:
+
+    async def _find_tags(self, uow: UnitOfWork, nfc_uids: Iterable[str]) -> dict[str, Row]:
+        """Метки по uid: из кэша, недостающие - одним запросом"""
+        tags, missing = {}, []
+        for nfc_uid in set(nfc_uids):
+            tag = nfc_tag_cache.get(nfc_uid)
+            if tag is None:
+                missing.append(nfc_uid)
+            else:
+                tags[nfc_uid] = tag
+
+        if missing:
+            for tag in await uow.object_nfc.find_by_uids(missing):
+                nfc_tag_cache.set(tag.nfc_uid, tag)
+                tags[tag.nfc_uid] = tag
+        return tags
     
     async def change_nfc(
         self, 
@@ -47,23 +78,26 @@ class NFCService:
             if check_label:
                 raise NFCLabelIsExistsExc
             
-            updated_nfc: ObjectNFC = await uow.object_nfc.update_by_filter({
+            updated_nfc: ObjectNFC | None = await uow.object_nfc.update_returning_or_none({
                 "label": user_data.label
             }, id=nfc_id)
+            if not updated_nfc:
+                raise NFCNotFoundExc
             
+            await uow.object_nfc.notify_tag_changed(updated_nfc.nfc_uid)
             await uow.commit()
+            invalidate_nfc_tag(updated_nfc.nfc_uid)
             return SNFCChange.model_validate(updated_nfc)
     
     async def session_nfc(self, uow: UnitOfWork, object_id: uuid.UUID, user: User) -> SNFCSessionTerminate:
         async with uow:
-            check_user_object: UserObjectAccess | None = await uow.user_object_access.find_one_or_none(
+            deleted_user_object: UserObjectAccess | None = await uow.user_object_access.delete_returning_or_none(
                 user_id=user.id,
                 object_id=object_id
             )
-            if not check_user_object:
+            if not deleted_user_object:
                 raise UserObjectSessionNotFoundExc
             
-            await uow.user_object_access.delete_by_filter(user_id=user.id, object_id=object_id)
             await uow.commit()
             return SNFCSessionTerminate.model_validate({"result": "success"})
     
@@ -73,14 +107,13 @@ class NFCService:
         nfc_id: uuid.UUID
     ) -> SNFCDelete:
         async with uow:
-            check_nfc: ObjectNFC | None = await uow.object_nfc.find_one_or_none(
-                id=nfc_id
-            )
-            if not check_nfc:
+            deleted_nfc: ObjectNFC | None = await uow.object_nfc.delete_returning_or_none(id=nfc_id)
+            if not deleted_nfc:
                 raise NFCNotFoundExc
             
-            await uow.object_nfc.delete_by_filter(id=nfc_id)
+            await uow.object_nfc.notify_tag_changed(deleted_nfc.nfc_uid)
             await uow.commit()
+            invalidate_nfc_tag(deleted_nfc.nfc_uid)
             
             return SNFCDelete.model_validate({"result": "success"})
     
@@ -97,112 +130,116 @@ class NFCService:
             nfc = await uow.object_nfc.find_all_by_filter(object_id=object_id)
             return [SNFCHistoryObjectList.model_validate(n) for n in nfc]
         
-    async def history_nfc_all(self, uow: UnitOfWork, user: User) -> list[SNFCHistoryObject]:
-        async with uow:
-            rows = await uow.object_nfc.history_all(user)
-
-            grouped = defaultdict(lambda: {"title": "", "dates": defaultdict(list)})
-
-            for row in rows:
-                using_id = row["using_id"]
-                scan_date = row["scan_date"]
+    async def history_nfc(
+        self,
+        uow: UnitOfWork,
+        user: User,
+        limit: int,
+        days: int,
+        cursor: str | None = None,
+        object_id: uuid.UUID | None = None
+    ) -> PageModel[SNFCHistoryObject]:
+        async with uow.read_only():
+            rows, next_cursor = await uow.object_nfc.history(user, limit, days, cursor, object_id)
+            return PageModel[SNFCHistoryObject](
+                items=[SNFCHistoryObject.model_validate(row._mapping) for row in rows],
+                next_cursor=next_cursor
+            )
+    
+    async def verify_nfc(
+        self,
+        uow: UnitOfWork,
+        user_data: SNFCCreate,
+        user: User,
+        object_id: uuid.UUID
+    ) -> SNFCVerify:
+        access_expires_at = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_EXPIRES_AT_MIN)
 
-                grouped[using_id]["title"] = row["title"]
-                grouped[using_id]["dates"][scan_date].append(
-                    NFCLabelScan(label=row["label"], scanned_at=row["scanned_at"])
-                )
+        async with uow:
+            tag = (await self._find_tags(uow, [user_data.nfc_uid])).get(user_data.nfc_uid)
+            if tag and tag.object_id != object_id:
+                # uid могли удалить и зарегистрировать на другом объекте: кэшу не верим, перечитываем из БД
+                invalidate_nfc_tag(user_data.nfc_uid)
+                tag = (await self._find_tags(uow, [user_data.nfc_uid])).get(user_data.nfc_uid)
+            if not tag or tag.object_id != object_id:
+                raise NFCNotFoundExc
 
-            history = [
-                SNFCHistoryObject(
-                    title=data["title"],
-                    using_id=using_id,
-                    data=[
-                        SNFCHistoryDate(date=scan_date, scans=scans)
-                        for scan_date, scans in sorted(dates.items(), reverse=True)
-                    ]
-                )
-                for using_id, data in grouped.items()
-                for dates in [data["dates"]]
-            ]
+            granted_until = await uow.user_object_access.grant_by_nfc(
+                user.id, object_id, user_data.nfc_uid, access_expires_at
+            )
+            if not granted_until:
+                invalidate_nfc_tag(user_data.nfc_uid)
+                raise NFCNotFoundExc
 
-            return history
+            await uow.commit()
+            return SNFCVerify.model_validate({"access_expires_at": granted_until})
+    
+    async def sync_nfc(self, uow: UnitOfWork, user_data: SNFCSync, user: User) -> SNFCSyncResult:
+        """
+        Пачка офлайн-сканирований: метки берутся из кэша и перепроверяются в той же вставке
+        истории по object_nfc, доступ считается один раз на объект по последнему скану.
+        """
+        now = datetime.now(UTC)
+        oldest = now - timedelta(days=settings.NFC_SYNC_MAX_AGE_DAYS)
+        access_ttl = timedelta(minutes=settings.ACCESS_EXPIRES_AT_MIN)
 
+        # повтор одного id внутри пачки - тот же скан
+        scans = list({scan.id: scan for scan in user_data.scans}.values())
 
-    
-    async def history_nfc(self, uow: UnitOfWork, object_id: uuid.UUID, user: User) -> list[SNFCHistoryObject]:
         async with uow:
-            rows = await uow.object_nfc.history(user, object_id)
+            tags = await self._find_tags(uow, (scan.nfc_uid for scan in scans))
+            # как в verify_nfc: метку из кэша с другим объектом могли перерегистрировать, перечитываем из БД
+            stale = {
+                scan.nfc_uid for scan in scans
+                if scan.nfc_uid in tags and tags[scan.nfc_uid].object_id != scan.object_id
+            }
+            if stale:
+                for nfc_uid in stale:
+                    invalidate_nfc_tag(nfc_uid)
+                    tags.pop(nfc_uid)
+                tags.update(await self._find_tags(uow, stale))
 
-            grouped = defaultdict(lambda: {"title": "", "dates": defaultdict(list)})
+            candidates, rejected = [], []
+            for scan in scans:
+                tag = tags.get(scan.nfc_uid)
+                if not tag or tag.object_id != scan.object_id or not oldest <= scan.scanned_at <= now + SCAN_CLOCK_SKEW:
+                    rejected.append(scan.id)
+                    continue
+                candidates.append(scan)
 
-            for row in rows:
-                using_id = row["using_id"]
-                scan_date = row["scan_date"]
+            # кэш только отсекает заведомо чужие метки; id метки по (nfc_uid, object_id) берет сама вставка
+            inserted = await uow.history_object_nfc.insert_scans(user.id, [
+                {
+                    "id": scan.id,
+                    "nfc_uid": scan.nfc_uid,
+                    "object_id": scan.object_id,
+                    "created_at": scan.scanned_at
+                }
+                for scan in candidates
+            ], oldest)
 
-                grouped[using_id]["title"] = row["title"]
-                grouped[using_id]["dates"][scan_date].append(
-                    NFCLabelScan(label=row["label"], scanned_at=row["scanned_at"])
-                )
+            accepted, duplicates, expires_by_object = [], [], {}
+            for scan in candidates:
+                if scan.id not in inserted:
+                    # метку удалили или перепривязали к другому объекту после попадания в кэш
+                    invalidate_nfc_tag(scan.nfc_uid)
+                    rejected.append(scan.id)
+                    continue
 
-            history = [
-                SNFCHistoryObject(
-                    title=data["title"],
-                    using_id=using_id,
-                    data=[
-                        SNFCHistoryDate(date=scan_date, scans=scans)
-                        for scan_date, scans in sorted(dates.items(), reverse=True)
-                    ]
-                )
-                for using_id, data in grouped.items()
-                for dates in [data["dates"]]
-            ]
+                (accepted if inserted[scan.id] else duplicates).append(scan.id)
+                access_expires_at = min(scan.scanned_at, now) + access_ttl
+                if access_expires_at > expires_by_object.get(scan.object_id, now):
+                    expires_by_object[scan.object_id] = access_expires_at
 
-            return history
+            access = await uow.user_object_access.extend_access(user.id, expires_by_object)
+            await uow.commit()
 
-    
-    async def verify_nfc(
-        self,
-        uow: UnitOfWork,
-        user_data: SNFCCreate,
-        user: User,
-        object_id: uuid.UUID
-    ) -> SNFCVerify:
-        async with uow:
-            check_nfc: ObjectNFC | None = await uow.object_nfc.find_one_or_none(
-                nfc_uid=user_data.nfc_uid,
-                object_id=object_id
-            )
-            if not check_nfc:
-                raise NFCNotFoundExc
-            
-            check_user_object: UserObjectAccess | None = await uow.user_object_access.find_one_or_none(
-                user_id=user.id,
-                object_id=object_id
+            return SNFCSyncResult(
+                accepted=accepted,
+                duplicates=duplicates,
+                rejected=rejected,
+                access=[SNFCSyncAccess.model_validate(row) for row in access]
             )
-            
-            access_expires_at = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_EXPIRES_AT_MIN)
-            
-            if check_user_object:
-                await uow.user_object_access.update_by_filter({
-                    "user_id": user.id,
-                    "object_id": object_id,
-                    "is_active": True,
-                    "access_expires_at": access_expires_at
-                }, user_id=user.id, object_id=object_id)
-            else:
-                await uow.user_object_access.insert_by_data({
-                    "user_id": user.id,
-                    "object_id": object_id,
-                    "is_active": True,
-                    "access_expires_at": access_expires_at
-                })
-            
-            await uow.history_object_nfc.insert_by_data({
-                "nfc_id": check_nfc.id,
-                "user_id": user.id
-            })
-            await uow.commit()
-            return SNFCVerify.model_validate({"access_expires_at": access_expires_at})
     
     async def create(
         self, 
@@ -236,5 +273,7 @@ class NFCService:
                 "user_id": user.id
             })
             
+            await uow.object_nfc.notify_tag_changed(new_nfc.nfc_uid)
             await uow.commit()
+            invalidate_nfc_tag(new_nfc.nfc_uid)
             return SNFCADD.model_validate(new_nfc)
\ No newline at end of file
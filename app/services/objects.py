@@ -1,7 +1,9 @@
+import hashlib
 import uuid
 
 from fastapi import UploadFile
 
+from app.config.main import settings
 from app.dependencies.unitofwork import UnitOfWork
 from app.exceptions.company import CompanyNotFoundExc
 from app.exceptions.objects import (
@@ -10,6 +12,7 @@ from app.exceptions.objects import (
     CheckListIsAcceptExc,
     CheckListNotFoundExc,
     CheckListObjectIsNotExistsExc,
+    InvalidTileExc,
     ObjectActNotRequiredExc,
     ObjectCategoryNotFoundExc,
     ObjectNotFoundExc,
@@ -28,6 +31,10 @@ from app.models.enums import (
 )
 from app.models.objects import Acts, CheckList, Objects, ObjectsCategories
 from app.models.users import User
+from app.repositories.objects import geofence_index
+from app.schemas.base import PageModel
+from app.schemas.company import SCompanyProjectStatuses
+from app.schemas.geometry import BBox, GeometryOptions
 from app.schemas.objects import (
     SActCreate,
     SActSuccessCreated,
@@ -36,18 +43,59 @@ from app.schemas.objects import (
     SCheckListSuccessCreated,
     SCountObjects,
     SObject,
+    SObjectByPoint,
     SObjectCreate,
     SObjectDetail,
     SObjectGEOCheck,
+    SObjectsCluster,
+    SObjectsCounters,
     SObjectsList,
+    SObjectsViewport,
     SObjectUpdated,
 )
+from app.utils.cache import TTLCache
 from app.utils.create_geom import create_geom_from_coords
 from app.utils.generate_using_id import using_id
 
+# Тайлы карты: (область видимости, z, x, y) -> (etag, mvt)
+tile_cache = TTLCache(maxsize=settings.TILE_CACHE_MAX_SIZE, ttl=settings.TILE_CACHE_TTL_SECONDS)
+# Счетчики вкладок: область видимости -> {(category_id, object_type): count}
+counters_cache = TTLCache(maxsize=settings.COUNTERS_CACHE_MAX_SIZE, ttl=settings.COUNTERS_CACHE_TTL_SECONDS)
+
+
+def invalidate_object_caches() -> None:
+    """Сбросить кэши, зависящие от объектов (вызывается после коммита изменений объектов)"""
+    tile_cache.clear()
+    counters_cache.clear()
+
 
 class ObjectsService:
     
+    @staticmethod
+    def _scope_key(user: User, company_id: uuid.UUID):
+        """Ключ кэша для набора объектов, видимых пользователю (как ObjectsRepository._scoped)"""
+        if user.role == UserRoleEnum.INSPECTIION:
+            return "all"
+        if user.role == UserRoleEnum.CONTRACTOR:
+            return ("contractor", user.company_id)
+        return ("company", company_id)
+    
+    async def get_tile(self, uow: UnitOfWork, z: int, x: int, y: int, user: User) -> tuple[str, bytes]:
+        if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise InvalidTileExc
+        
+        key = (self._scope_key(user, user.company_id), z, x, y)
+        cached = tile_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        async with uow.read_only():
+            tile = await uow.objects.get_tile(z, x, y, user)
+        
+        etag = f'"{hashlib.blake2b(tile, digest_size=16).hexdigest()}"'
+        tile_cache.set(key, (etag, tile))
+        return etag, tile
+    
     async def check_geo(
         self, 
         uow: UnitOfWork, 
@@ -69,35 +117,41 @@ class ObjectsService:
             
             return SObjectGEOCheck.model_validate({"result": "success"})
     
+    async def find_by_point(
+        self,
+        uow: UnitOfWork,
+        company_id: uuid.UUID,
+        user: User,
+        latitude: float,
+        longitude: float
+        ) -> list[SObjectByPoint]:
+        async with uow.read_only():
+            if latitude == 0.00 and longitude == 0.00:
+                raise InvalidCoordsUserExc
+            
+            return await uow.objects.find_by_point(latitude, longitude, company_id, user)
+    
     async def object_check_list(self, uow: UnitOfWork, object_id: uuid.UUID) -> SCheckListDetail:
         async with uow:
-            check_object: Objects | None = await uow.objects.find_one_or_none(id=object_id)
-            if not check_object:
+            row = await uow.acts.get_check_list_detail(object_id)
+            if not row:
                 raise ObjectNotFoundExc
-            
-            check_list = await uow.acts.get_check_list_detail(object_id)
-            if not check_list:
+            if not row.CheckList:
                 raise ActObjectIsNotExistsExc
 
-            dto = SCheckListDetail.model_validate(check_list).model_dump()
-            dto["responsible_fio"] = (
-                check_list.object.responsible_user.fio
-                if check_list.object and check_list.object.responsible_user else None
-            )
-            dto["contractor_title"] = (
-                check_list.object.contractor.title
-                if check_list.object and check_list.object.contractor else None
-            )
+            dto = SCheckListDetail.model_validate(row.CheckList).model_dump()
+            dto["responsible_fio"] = row.responsible_fio
+            dto["contractor_title"] = row.contractor_title
 
             return SCheckListDetail(**dto)
     
-    async def get_object_detail(self, uow: UnitOfWork, object_id: uuid.UUID) -> SObjectDetail:
+    async def get_object_detail(
+        self, uow: UnitOfWork, object_id: uuid.UUID, geometry: GeometryOptions
+    ) -> SObjectDetail:
         async with uow:
-            check_object: Objects | None = await uow.objects.find_one_or_none(id=object_id)
-            if not check_object:
+            object_detail = await uow.objects.get_object_detail(object_id, geometry)
+            if not object_detail:
                 raise ObjectNotFoundExc
-            
-            object_detail = await uow.objects.get_object_detail(object_id)
             return SObjectDetail.model_validate(object_detail)
     
     async def send_file(
@@ -130,6 +184,7 @@ class ObjectsService:
             }, id=object_id)
             
             await uow.commit()
+            invalidate_object_caches()
             return SActSuccessCreated.model_validate(updated_act)
         
     async def checklist_change(
@@ -139,14 +194,25 @@ class ObjectsService:
         action: ChecklistObjectsActionEnum
         ) -> SObjectUpdated:
         async with uow:
-            updated_object = None
-            
-            check_object: Objects | None = await uow.objects.find_one_or_none(id=object_id)
-            if not check_object:
-                raise ObjectNotFoundExc
+            if action == ChecklistObjectsActionEnum.ACCEPT:
+                check_list_status = CheckListStatusEnum.ACCEPT
+                object_data = {
+                    "status": ObjectStatusesEnum.ACT,
+                    "object_type": ObjectTypeEnum.ACT_OPENING
+                }
+            elif action == ChecklistObjectsActionEnum.DENY:
+                check_list_status = CheckListStatusEnum.REJECTED
+                object_data = {
+                    "status": ObjectStatusesEnum.KNOWN,
+                    "object_type": ObjectTypeEnum.NOT_ACTIVE
+                }
             
-            get_checklist: CheckList | None = await uow.check_list.find_one_or_none(object_id=check_object.id)
-            if not get_checklist:
+            updated_checklist: CheckList | None = await uow.check_list.update_returning_or_none({
+                "status": check_list_status
+            }, object_id=object_id)
+            if not updated_checklist:
+                if not await uow.objects.count_by_filter(id=object_id):
+                    raise ObjectNotFoundExc
                 raise CheckListNotFoundExc
             
             if action == ChecklistObjectsActionEnum.ACCEPT:
@@ -156,33 +222,18 @@ class ObjectsService:
                 )
                 if check_act_status:
                     raise CheckListIsAcceptExc
-                
-                updated_object = await uow.objects.update_by_filter({
-                    "status": ObjectStatusesEnum.ACT,
-                    "object_type": ObjectTypeEnum.ACT_OPENING           
-                }, id=object_id)
-                await uow.check_list.update_by_filter({
-                    "status": CheckListStatusEnum.ACCEPT
-                }, object_id=object_id)
+            
+            updated_object: Objects = await uow.objects.update_by_filter(object_data, id=object_id)
+            
+            if action == ChecklistObjectsActionEnum.ACCEPT:
                 await uow.acts.insert_by_data({
                     "object_id": object_id,
                     "status": ActStatusEnum.REQUIRED
                 })
                 
-            elif action == ChecklistObjectsActionEnum.DENY:
-                await uow.check_list.update_by_filter({
-                    "status": CheckListStatusEnum.REJECTED
-                }, object_id=object_id)
-                updated_object = await uow.objects.update_by_filter({
-                    "status": ObjectStatusesEnum.KNOWN,
-                    "object_type": ObjectTypeEnum.NOT_ACTIVE           
-                }, id=object_id)
-                
             await uow.commit()
-            if updated_object:
-                return SObjectUpdated.model_validate(updated_object)
-            else:
-                return SObjectUpdated.model_validate(check_object)
+            invalidate_object_caches()
+            return SObjectUpdated.model_validate(updated_object)
     
     async def act_change(
         self, 
@@ -191,40 +242,32 @@ class ObjectsService:
         action: ActObjectsActionEnum
         ) -> SObjectUpdated:
         async with uow:
-            updated_object = None
-            
-            check_object: Objects | None = await uow.objects.find_one_or_none(id=object_id)
-            if not check_object:
-                raise ObjectNotFoundExc
-            
-            get_act: Acts | None = await uow.acts.find_one_or_none(object_id=check_object.id)
-            if not get_act:
-                raise ActNotFoundExc
-            
             if action == ActObjectsActionEnum.ACCEPT:
-                updated_object = await uow.objects.update_by_filter({
+                act_status = ActStatusEnum.ACCEPT
+                object_data = {
                     "status": ObjectStatusesEnum.PLAN,
-                    "object_type": ObjectTypeEnum.ACTIVE           
-                }, id=object_id)
-                await uow.acts.update_by_filter({
-                    "status": ActStatusEnum.ACCEPT
-                }, object_id=object_id)
-                
+                    "object_type": ObjectTypeEnum.ACTIVE
+                }
             elif action == ActObjectsActionEnum.DENY:
-                await uow.acts.update_by_filter({
-                    "status": ActStatusEnum.REJECTED
-                }, object_id=object_id)
-                updated_object = await uow.objects.update_by_filter({
+                act_status = ActStatusEnum.REJECTED
+                object_data = {
                     "status": ObjectStatusesEnum.ACT,
-                    "object_type": ObjectTypeEnum.ACT_OPENING           
-                }, id=object_id)
+                    "object_type": ObjectTypeEnum.ACT_OPENING
+                }
+            
+            updated_act: Acts | None = await uow.acts.update_returning_or_none({
+                "status": act_status
+            }, object_id=object_id)
+            if not updated_act:
+                if not await uow.objects.count_by_filter(id=object_id):
+                    raise ObjectNotFoundExc
+                raise ActNotFoundExc
+            
+            updated_object: Objects = await uow.objects.update_by_filter(object_data, id=object_id)
                 
             await uow.commit()
-            
-            if updated_object:
-                return SObjectUpdated.model_validate(updated_object)
-            else:
-                return SObjectUpdated.model_validate(check_object)
+            invalidate_object_caches()
+            return SObjectUpdated.model_validate(updated_object)
     
     async def activate_object_check_list(
         self, 
@@ -262,16 +305,19 @@ class ObjectsService:
                 "date_verification": user_data.date_verification
             }, object_id=object_id)
 
-            for doc in user_data.act_docx:
-                await uow.check_list_document.insert_by_data({
+            await uow.check_list_document.insert_many([
+                {
                     "checklist_id": new_check_list.id,
                     "code": doc.code,
                     "title": doc.title,
                     "status": doc.status,
                     "description": doc.description
-                })
+                }
+                for doc in user_data.act_docx
+            ], returning=False)
             
             await uow.commit()
+            invalidate_object_caches()
             return SCheckListSuccessCreated.model_validate(new_check_list)
     
     async def get_all_objects_by_filter(
@@ -279,22 +325,66 @@ class ObjectsService:
         uow: UnitOfWork, 
         filter_by: ObjectTypeFilter,
         company_id: uuid.UUID,
-        user: User
-        ) -> list[SObjectsList]:
-        async with uow:
+        user: User,
+        limit: int,
+        cursor: str | None = None
+        ) -> PageModel[SObjectsList]:
+        async with uow.read_only():
             check_company: Company | None = await uow.company.find_one_or_none(id=company_id)
             if not check_company:
                 raise CompanyNotFoundExc
             
-            objects = await uow.objects.get_all_objects_by_filter(filter_by, company_id, user)
-            return [SObjectsList.model_validate(o) for o in objects]
+            objects, next_cursor = await uow.objects.get_all_objects_by_filter(
+                filter_by, company_id, user, limit, cursor
+            )
+            return PageModel[SObjectsList](
+                items=[SObjectsList.model_validate(o) for o in objects],
+                next_cursor=next_cursor
+            )
+
+    
+    async def viewport(
+        self,
+        uow: UnitOfWork,
+        company_id: uuid.UUID,
+        user: User,
+        bbox: BBox,
+        zoom: int | None,
+        geometry: GeometryOptions
+        ) -> SObjectsViewport:
+        async with uow.read_only():
+            if zoom is not None and zoom <= settings.VIEWPORT_CLUSTER_MAX_ZOOM:
+                cell_size = 360 / 2 ** zoom / settings.VIEWPORT_CLUSTER_CELLS_PER_TILE
+                clusters = await uow.objects.cluster_objects(company_id, user, bbox, cell_size)
+                return SObjectsViewport(clusters=[SObjectsCluster.model_validate(dict(c)) for c in clusters])
 
+            projects = await uow.objects.get_status_projects(company_id, user, geometry, bbox)
+            return SObjectsViewport(objects=[SCompanyProjectStatuses.model_validate(p) for p in projects])
     
     async def get_all_categories_objects(self, uow: UnitOfWork) -> list[SCategoriesObjects]:
-        async with uow:
+        async with uow.read_only():
             categories = await uow.objects_categories.find_all()
             return [SCategoriesObjects.model_validate(category) for category in categories]
     
+    async def _object_counters(
+        self, uow: UnitOfWork, company_id: uuid.UUID, user: User
+    ) -> dict[tuple[uuid.UUID, str], int]:
+        # company_id в ключе всегда: запись появляется только после проверки компании,
+        # поэтому попадание в кэш означает, что компания уже проверена
+        key = (self._scope_key(user, company_id), company_id)
+        counters = counters_cache.get(key)
+        if counters is not None:
+            return counters
+        
+        check_company: Company | None = await uow.company.find_one_or_none(id=company_id)
+        if not check_company:
+            raise CompanyNotFoundExc
+        
+        rows = await uow.objects.count_by_category_and_type(company_id, user)
+        counters = {(row.category_id, row.object_type): row.count for row in rows}
+        counters_cache.set(key, counters)
+        return counters
+    
     async def count_objects(
         self, 
         uow: UnitOfWork, 
@@ -303,18 +393,39 @@ class ObjectsService:
         company_id: uuid.UUID,
         user: User
         ) -> SCountObjects:
-        async with uow:
-            check_category: ObjectsCategories | None = await uow.objects_categories.find_one_or_none(id=category_id)
-            if not check_category:
-                raise ObjectCategoryNotFoundExc
-            
-            check_company: Company | None = await uow.company.find_one_or_none(id=company_id)
-            if not check_company:
-                raise CompanyNotFoundExc
+        async with uow.read_only():
+            if category_id:
+                check_category: ObjectsCategories | None = await uow.objects_categories.find_one_or_none(
+                    id=category_id
+                )
+                if not check_category:
+                    raise ObjectCategoryNotFoundExc
             
-            count = await uow.objects.count_objects(category_id, filter_by, company_id, user)
+            counters = await self._object_counters(uow, company_id, user)
+            count = sum(
+                value for (object_category_id, object_type), value in counters.items()
+                if object_type == filter_by and (not category_id or object_category_id == category_id)
+            )
             return SCountObjects.model_validate({"count": count})
     
+    async def objects_counters(
+        self,
+        uow: UnitOfWork,
+        category_id: uuid.UUID | None,
+        company_id: uuid.UUID,
+        user: User
+        ) -> SObjectsCounters:
+        async with uow.read_only():
+            counters = await self._object_counters(uow, company_id, user)
+            
+            tabs = dict.fromkeys(ObjectTypeFilter, 0)
+            for (object_category_id, object_type), value in counters.items():
+                if category_id and object_category_id != category_id:
+                    continue
+                tabs[ObjectTypeFilter.ALL] += value
+                tabs[ObjectTypeFilter(object_type)] += value
+            return SObjectsCounters.model_validate({tab.value: value for tab, value in tabs.items()})
+    
     async def create(
         self, 
         uow: UnitOfWork, 
@@ -328,6 +439,7 @@ class ObjectsService:
                 raise CompanyNotFoundExc
             
             geom = create_geom_from_coords(user_data.coords)
+            category_id = "e03fc0b0-5202-4864-97c1-4e59530d6841"
             new_object: Objects = await uow.objects.insert_by_data(
                 {
                     "using_id": using_id(),
@@ -337,12 +449,14 @@ class ObjectsService:
                     "city": user_data.city,
                     "responsible_user_id": None,
                     "contractor_id": None,
-                    "category_id": "e03fc0b0-5202-4864-97c1-4e59530d6841",
+                    "category_id": category_id,
                     "date_delivery_verification": user_data.date_delivery_verification,
                     "start_date": user_data.start_date,
                     "status": ObjectStatusesEnum.KNOWN,
                     "object_type": ObjectTypeEnum.NOT_ACTIVE,
-                    "geom": geom
+                    "geom": geom,
+                    "geofence_radius": user_data.geofence_radius,
+                    "geofence": uow.objects.geofence(geom, category_id, user_data.geofence_radius)
                 }
             )
             await uow.check_list.insert_by_data({
@@ -351,6 +465,8 @@ class ObjectsService:
             })
             
             await uow.commit()
+            geofence_index.invalidate()
+            invalidate_object_caches()
             return SObject(
                 id=new_object.id,
                 using_id=new_object.using_id,
@@ -9,8 +9,9 @@ from app.exceptions.remarks import RemarkAnswerIsExistsExc, RemarkNotFoundExc
 from app.exceptions.users import UserIsNotActivatedExc
 from app.models.enums import RemarkActionEnum, RemarkStatusEnum
 from app.models.objects import Objects
-from app.models.remarks import RemarkAnswer, RemarkAnswerFile, RemarkPhoto, Remarks, RemarksItem
+from app.models.remarks import RemarkAnswer, Remarks, RemarksItem
 from app.models.users import User, UserObjectAccess
+from app.schemas.base import PageModel
 from app.schemas.remarks import (
     SRemark,
     SRemarkAnswer,
@@ -57,7 +58,7 @@ class RemarksService:
             uow.session.add(new_answer)
             await uow.session.flush()
 
-            saved_files: list[RemarkAnswerFile] = []
+            saved_files: list[str] = []
             if files:
                 path_folder = "images/remark_answers"
 
@@ -66,13 +67,12 @@ class RemarksService:
                     object_name = f"{path_folder}/{uuid.uuid4()}.{ext}"
 
                     url: str = await uow.images.upload_any_file(upload_file, object_name)
+                    saved_files.append(url)
 
-                    file_record = RemarkAnswerFile(
-                        answer_id=new_answer.id,
-                        file_path=url
-                    )
-                    uow.session.add(file_record)
-                    saved_files.append(file_record)
+            await uow.remark_answer_file.insert_many([
+                {"answer_id": new_answer.id, "file_path": url}
+                for url in saved_files
+            ], returning=False)
 
             await uow.remarks_item.update_by_filter({
                 "status": RemarkStatusEnum.REVIEW
@@ -83,7 +83,7 @@ class RemarksService:
                 id=new_answer.id,
                 comment=new_answer.comment,
                 created_at=new_answer.created_at,
-                files=[SRemarkAnswerFile(file_path=f.file_path) for f in saved_files]
+                files=[SRemarkAnswerFile(file_path=url) for url in saved_files]
             )
 
     
@@ -94,20 +94,19 @@ class RemarksService:
         user_data: SRemarkChangeStatus
     ) -> SRemarkChangedSuccess:
         async with uow:
-            check_remark: RemarksItem | None = await uow.remarks_item.find_one_or_none(id=remark_id)
+            if user_data.action == RemarkActionEnum.ACCEPT:
+                item_status = RemarkStatusEnum.FIXED
+            elif user_data.action == RemarkActionEnum.DENY:
+                item_status = RemarkStatusEnum.NOT_FIXED
+
+            check_remark: RemarksItem | None = await uow.remarks_item.update_returning_or_none(
+                {"status": item_status},
+                id=remark_id
+            )
             if not check_remark:
                 raise RemarkNotFoundExc
 
-            if user_data.action == RemarkActionEnum.ACCEPT:
-                await uow.remarks_item.update_many_by_filter(
-                    {"status": RemarkStatusEnum.FIXED},
-                    id=remark_id
-                )
-            elif user_data.action == RemarkActionEnum.DENY:
-                await uow.remarks_item.update_many_by_filter(
-                    {"status": RemarkStatusEnum.NOT_FIXED},
-                    id=remark_id
-                )
+            if user_data.action == RemarkActionEnum.DENY:
                 await uow.remark_answer.delete_by_filter(remark_item_id=remark_id)
 
             all_items: list[RemarksItem] = await uow.remarks_item.find_all(
@@ -139,22 +138,20 @@ class RemarksService:
         remark_id: uuid.UUID
     ) -> SRemarksDetail:
         async with uow:
-            check_remark: Remarks | None = await uow.remarks.find_one_or_none(id=remark_id)
-            if not check_remark:
-                raise RemarkNotFoundExc
-                
             remarks = await uow.remarks.get_remarks_detail(remark_id)
+            if not remarks:
+                raise RemarkNotFoundExc
             return SRemarksDetail.model_validate(remarks)
     
     async def get_all_remarks(
-        self, uow: UnitOfWork, object_id: uuid.UUID
-    ) -> list[SRemarksList]:
-        async with uow:
+        self, uow: UnitOfWork, object_id: uuid.UUID, limit: int, cursor: str | None = None
+    ) -> PageModel[SRemarksList]:
+        async with uow.read_only():
             check_object = await uow.objects.find_one_or_none(id=object_id)
             if not check_object:
                 raise ObjectNotFoundExc
 
-            remarks_rows = await uow.remarks.get_all_remarks(object_id)
+            remarks_rows, next_cursor = await uow.remarks.get_all_remarks(object_id, limit, cursor)
 
             user_ids = [r.responsible_user_id for r in remarks_rows if r.responsible_user_id]
             users = {}
@@ -162,17 +159,20 @@ class RemarksService:
                 rows = await uow.users.get_users_by_ids(user_ids)
                 users = {u.id: u.fio for u in rows}
 
-            return [
-                SRemarksList(
-                    id=row.id,
-                    object_name=row.object_name,
-                    responsible_user_name=users.get(row.responsible_user_id),
-                    status=row.status,
-                    date_remark=row.date_remark,
-                    expiration_date=row.expiration_date
-                )
-                for row in remarks_rows
-            ]
+            return PageModel[SRemarksList](
+                items=[
+                    SRemarksList(
+                        id=row.id,
+                        object_name=row.object_name,
+                        responsible_user_name=users.get(row.responsible_user_id),
+                        status=row.status,
+                        date_remark=row.date_remark,
+                        expiration_date=row.expiration_date
+                    )
+                    for row in remarks_rows
+                ],
+                next_cursor=next_cursor
+            )
     
     async def create_remark(
         self,
@@ -232,6 +232,7 @@ class RemarksService:
             await uow.session.flush()
 
             files_map = {file.filename: file for file in files} if files else {}
+            photos: list[tuple[RemarksItem, str]] = []
 
             for remark_data in data:
                 remark_item = RemarksItem(
@@ -256,9 +257,13 @@ class RemarksService:
                         object_name = f"{path_folder}/{uuid.uuid4()}.{ext}"
 
                         url: str = await uow.images.upload_any_file(upload_file, object_name)
+                        photos.append((remark_item, url))
 
-                        photo = RemarkPhoto(file_path=url, remark_item=remark_item)
-                        uow.session.add(photo)
+            await uow.session.flush()
+            await uow.remark_photo.insert_many([
+                {"remark_item_id": item.id, "file_path": url}
+                for item, url in photos
+            ], returning=False)
 
             await uow.commit()
 
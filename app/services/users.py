@@ -4,9 +4,15 @@ from fastapi import Request, Response
 
 from app.config.main import settings
 from app.dependencies.unitofwork import UnitOfWork
-from app.dependencies.users import authenticate_user, create_access_token, create_refresh_token
+from app.dependencies.users import (
+    authenticate_user,
+    create_access_token,
+    create_refresh_token,
+    invalidate_user_cache,
+)
 from app.exceptions.users import IncorrectEmailExc, InvalidTokenExc, TokenExpiredExc, UserNotFoundExc
 from app.models.users import RefreshSession, User
+from app.schemas.base import PageModel
 from app.schemas.users import SUserCurrent, SUserLogin, SUserRole, SUsersContractor, SUserTokens
 
 
@@ -17,10 +23,15 @@ class UsersService:
             current_user = await uow.users.current(user)
             return SUserCurrent.model_validate(current_user)
     
-    async def get_contractors(self, uow: UnitOfWork) -> list[SUsersContractor]:
+    async def get_contractors(
+        self, uow: UnitOfWork, limit: int, cursor: str | None = None
+    ) -> PageModel[SUsersContractor]:
         async with uow:
-            contractors = await uow.users.find_all_contractors()
-            return [SUsersContractor.model_validate(contractor) for contractor in contractors]
+            contractors, next_cursor = await uow.users.find_all_contractors(limit, cursor)
+            return PageModel[SUsersContractor](
+                items=[SUsersContractor.model_validate(contractor) for contractor in contractors],
+                next_cursor=next_cursor
+            )
     
     async def get_user_role(self, uow: UnitOfWork, email: str) -> SUserRole:
         async with uow:
@@ -131,3 +142,4 @@ class UsersService:
             if refresh_session:
                 await uow.refresh_session.delete_by_filter(id=refresh_session.id)
                 await uow.commit()
+                invalidate_user_cache(refresh_session.user_id)
@@ -10,7 +10,8 @@ from app.exceptions.violations import ViolationAnswerIsExistsExc, ViolationNotFo
 from app.models.enums import ViolationActionEnum, ViolationStatusEnum
 from app.models.objects import Objects
 from app.models.users import User, UserObjectAccess
-from app.models.violations import ViolationAnswer, ViolationAnswerFile, ViolationPhoto, Violations, ViolationsItem
+from app.models.violations import ViolationAnswer, Violations, ViolationsItem
+from app.schemas.base import PageModel
 from app.schemas.violations import (
     SVialationAnswer,
     SVialationAnswerCreate,
@@ -57,7 +58,7 @@ class ViolationsService:
             uow.session.add(new_answer)
             await uow.session.flush()
 
-            saved_files: list[ViolationAnswerFile] = []
+            saved_files: list[str] = []
             if files:
                 path_folder = "images/violation_answers"
 
@@ -66,13 +67,12 @@ class ViolationsService:
                     object_name = f"{path_folder}/{uuid.uuid4()}.{ext}"
 
                     url: str = await uow.images.upload_any_file(upload_file, object_name)
+                    saved_files.append(url)
 
-                    file_record = ViolationAnswerFile(
-                        answer_id=new_answer.id,
-                        file_path=url
-                    )
-                    uow.session.add(file_record)
-                    saved_files.append(file_record)
+            await uow.violation_answer_file.insert_many([
+                {"answer_id": new_answer.id, "file_path": url}
+                for url in saved_files
+            ], returning=False)
 
             await uow.violations_item.update_by_filter({
                 "status": ViolationStatusEnum.REVIEW
@@ -83,7 +83,7 @@ class ViolationsService:
                 id=new_answer.id,
                 comment=new_answer.comment,
                 created_at=new_answer.created_at,
-                files=[SVialationAnswerFile(file_path=f.file_path) for f in saved_files]
+                files=[SVialationAnswerFile(file_path=url) for url in saved_files]
             )
     
     async def violations_change_status(
@@ -93,20 +93,19 @@ class ViolationsService:
         user_data: SViolationChangeStatus
     ) -> SViolationChangedSuccess:
         async with uow:
-            check_violation: ViolationsItem | None = await uow.violations_item.find_one_or_none(id=violation_id)
+            if user_data.action == ViolationActionEnum.ACCEPT:
+                item_status = ViolationStatusEnum.FIXED
+            elif user_data.action == ViolationActionEnum.DENY:
+                item_status = ViolationStatusEnum.NOT_FIXED
+
+            check_violation: ViolationsItem | None = await uow.violations_item.update_returning_or_none(
+                {"status": item_status},
+                id=violation_id
+            )
             if not check_violation:
                 raise ViolationNotFoundExc
 
-            if user_data.action == ViolationActionEnum.ACCEPT:
-                await uow.violations_item.update_many_by_filter(
-                    {"status": ViolationStatusEnum.FIXED},
-                    id=violation_id
-                )
-            elif user_data.action == ViolationActionEnum.DENY:
-                await uow.violations_item.update_many_by_filter(
-                    {"status": ViolationStatusEnum.NOT_FIXED},
-                    id=violation_id
-                )
+            if user_data.action == ViolationActionEnum.DENY:
                 await uow.violation_answer.delete_by_filter(violation_item_id=violation_id)
 
             all_items: list[ViolationsItem] = await uow.violations_item.find_all(
@@ -138,22 +137,20 @@ class ViolationsService:
         violation_id: uuid.UUID
     ) -> SViolationsDetail:
         async with uow:
-            check_violation: Violations | None = await uow.violations.find_one_or_none(id=violation_id)
-            if not check_violation:
-                raise ViolationNotFoundExc
-                
             violations = await uow.violations.get_violations_detail(violation_id)
+            if not violations:
+                raise ViolationNotFoundExc
             return SViolationsDetail.model_validate(violations)
     
     async def get_all_violations(
-        self, uow: UnitOfWork, object_id: uuid.UUID
-    ) -> list[SViolationsList]:
-        async with uow:
+        self, uow: UnitOfWork, object_id: uuid.UUID, limit: int, cursor: str | None = None
+    ) -> PageModel[SViolationsList]:
+        async with uow.read_only():
             check_object = await uow.objects.find_one_or_none(id=object_id)
             if not check_object:
                 raise ObjectNotFoundExc
 
-            violations_rows = await uow.violations.get_all_violations(object_id)
+            violations_rows, next_cursor = await uow.violations.get_all_violations(object_id, limit, cursor)
 
             user_ids = [r.responsible_user_id for r in violations_rows if r.responsible_user_id]
             users = {}
@@ -161,17 +158,20 @@ class ViolationsService:
                 rows = await uow.users.get_users_by_ids(user_ids)
                 users = {u.id: u.fio for u in rows}
 
-            return [
-                SViolationsList(
-                    id=row.id,
-                    object_name=row.object_name,
-                    responsible_user_name=users.get(row.responsible_user_id),
-                    status=row.status,
-                    date_violation=row.date_violation,
-                    expiration_date=row.expiration_date
-                )
-                for row in violations_rows
-            ]
+            return PageModel[SViolationsList](
+                items=[
+                    SViolationsList(
+                        id=row.id,
+                        object_name=row.object_name,
+                        responsible_user_name=users.get(row.responsible_user_id),
+                        status=row.status,
+                        date_violation=row.date_violation,
+                        expiration_date=row.expiration_date
+                    )
+                    for row in violations_rows
+                ],
+                next_cursor=next_cursor
+            )
     
     async def create_violation(
         self,
@@ -231,6 +231,7 @@ class ViolationsService:
             await uow.session.flush()
 
             files_map = {file.filename: file for file in files} if files else {}
+            photos: list[tuple[ViolationsItem, str]] = []
 
             for violation_data in data:
                 violation_item = ViolationsItem(
@@ -255,9 +256,13 @@ class ViolationsService:
                         object_name = f"{path_folder}/{uuid.uuid4()}.{ext}"
 
                         url: str = await uow.images.upload_any_file(upload_file, object_name)
+                        photos.append((violation_item, url))
 
-                        photo = ViolationPhoto(file_path=url, violation_item=violation_item)
-                        uow.session.add(photo)
+            await uow.session.flush()
+            await uow.violation_photo.insert_many([
+                {"violation_item_id": item.id, "file_path": url}
+                for item, url in photos
+            ], returning=False)
 
             await uow.commit()
 
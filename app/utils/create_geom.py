@@ -1,4 +1,11 @@
+from collections.abc import Sequence
+from itertools import pairwise
+
+import numpy as np
+import shapely
+from geoalchemy2 import Geography
 from shapely.geometry import MultiPolygon, Polygon
+from sqlalchemy import cast, func
 
 
 def create_geom_from_coords(coords_list):
@@ -12,3 +19,48 @@ def create_geom_from_coords(coords_list):
         geom = Polygon(coords_list)
     
     return geom.wkt
+
+
+def as_geography(expr):
+    """`expr::geography` без typmod - совпадает с выражением индекса idx_objects_geom_geography"""
+    return cast(expr, Geography(geometry_type=None))
+
+
+def geography_point(lat: float, lon: float):
+    """SQL-выражение точки пользователя в geography (расстояния в метрах)"""
+    return as_geography(func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
+
+
+def _wkb_bytes(value) -> bytes | None:
+    if value is None:
+        return None
+    return bytes(value.data) if hasattr(value, "data") else bytes(value)
+
+
+def coords_from_wkb(values: Sequence) -> list[list | None]:
+    """
+    Координаты внешних контуров для пачки WKB за один проход shapely:
+    Polygon -> [(x, y), ...], MultiPolygon -> [[(x, y), ...], ...], остальное -> None
+    """
+    geoms = shapely.from_wkb([_wkb_bytes(v) for v in values])
+    type_ids = shapely.get_type_id(geoms)
+    result: list[list | None] = [None] * len(geoms)
+
+    polygon_rows = np.flatnonzero(type_ids == shapely.GeometryType.POLYGON)
+    multi_rows = np.flatnonzero(type_ids == shapely.GeometryType.MULTIPOLYGON)
+    parts, part_rows = shapely.get_parts(geoms[multi_rows], return_index=True)
+
+    # все внешние контуры подряд: сначала полигоны, потом части мультиполигонов
+    rings = shapely.get_exterior_ring(np.concatenate([geoms[polygon_rows], parts]))
+    coords, ring_index = shapely.get_coordinates(rings, return_index=True)
+    bounds = np.searchsorted(ring_index, np.arange(len(rings) + 1))
+    ring_coords = [coords[start:end].tolist() for start, end in pairwise(bounds)]
+
+    for i, row in enumerate(polygon_rows):
+        result[row] = ring_coords[i]
+    for row in multi_rows:
+        result[row] = []
+    for i, row in enumerate(part_rows, start=len(polygon_rows)):
+        result[multi_rows[row]].append(ring_coords[i])
+
+    return result
@@ -0,0 +1,84 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+
+import asyncpg
+
+logger = logging.getLogger("app.db")
+
+# Как часто проверять соединение (обрыв сети без FIN сам не закрывает сокет) и предел паузы переподключения
+CHECK_INTERVAL_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60
+
+
+class PgListener:
+    """
+    LISTEN на канал в отдельном соединении вне пула; при обрыве переподключается с экспоненциальной паузой.
+    NOTIFY, пришедшие без соединения, потеряны, поэтому после каждого подключения вызывается on_connect
+    (например, сбросить кэш целиком).
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        callback: Callable[[str], None],
+        on_connect: Callable[[], None] | None = None,
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.callback = callback
+        self.on_connect = on_connect
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self.callback(payload)
+
+    async def _run(self) -> None:
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda conn: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                if self.on_connect:
+                    self.on_connect()
+                backoff = 1
+
+                while not closed.is_set():
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(closed.wait(), CHECK_INTERVAL_SECONDS)
+                    if not closed.is_set():
+                        await connection.fetchval("SELECT 1", timeout=CHECK_INTERVAL_SECONDS)
+                logger.warning("LISTEN %s: соединение закрыто, переподключение через %s с", self.channel, backoff)
+                await asyncio.sleep(backoff)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("LISTEN %s: ошибка соединения (%s), повтор через %s с", self.channel, exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+            finally:
+                if connection and not connection.is_closed():
+                    connection.terminate()
+
+
+def listen(
+    dsn: str, channel: str, callback: Callable[[str], None], on_connect: Callable[[], None] | None = None
+) -> PgListener:
+    """Запустить LISTEN в фоне; callback получает payload. Остановить - await listener.close()"""
+    listener = PgListener(dsn, channel, callback, on_connect)
+    listener.start()
+    return listener
@@ -0,0 +1,125 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("app.db")
+
+# Списки параметров IN (...) разной длины считаем одной формой запроса
+_PARAM = r"(?:\$\d+|%\([^)]+\)s|\?)(?:::[\w\[\]]+)?"
+_PARAMS_LIST = re.compile(rf"{_PARAM}(?:\s*,\s*{_PARAM})*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _WHITESPACE.sub(" ", _PARAMS_LIST.sub("?", statement)).strip()
+
+
+class QueryStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.sessions = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter[str] = Counter()
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Формы запросов, выполненные больше `threshold` раз (похоже на N+1)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_time * 1000:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.1f}"
+        )
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def reset_query_stats(token: Token) -> None:
+    _query_stats.reset(token)
+
+
+def get_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+def setup_query_stats_logging() -> None:
+    """
+    Вывод логгера app.db в stderr с уровнем INFO: gunicorn/uvicorn не настраивают
+    логгеры приложения, и без обработчика INFO-записи отбрасываются.
+    """
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def log_query_stats(
+    method: str, path: str, status_code: int, stats: QueryStats, n_plus_one_threshold: int, slow_sql_ms: int
+) -> None:
+    slowest_ms = round(stats.slowest_time * 1000, 1)
+    logger.info(json.dumps({
+        "event": "db_stats",
+        "method": method,
+        "path": path,
+        "status": status_code,
+        "queries": stats.count,
+        "sessions": stats.sessions,
+        "db_ms": round(stats.total_time * 1000, 1),
+        "slowest_ms": slowest_ms,
+        "slowest_sql": stats.slowest_statement if slowest_ms >= slow_sql_ms else None,
+    }, ensure_ascii=False))
+
+    for shape, count in stats.repeated(n_plus_one_threshold):
+        logger.warning(json.dumps({
+            "event": "db_n_plus_one",
+            "method": method,
+            "path": path,
+            "count": count,
+            "sql": shape,
+        }, ensure_ascii=False))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _query_stats.get()
+    if stats is not None and context is not None:
+        stats.add(statement, time.perf_counter() - context._query_started_at)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подписаться на выполнение запросов движка (учитываются только внутри start_query_stats)"""
+    if event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -6,6 +6,7 @@ from functools import wraps
 from fastapi.responses import JSONResponse
 
 from app.exceptions.base import BaseHTTPException
+from app.schemas.base import PageModel
 
 
 def api_exception_handler(fn: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
@@ -19,6 +20,14 @@ def api_exception_handler(fn: Callable[..., Awaitable]) -> Callable[..., Awaitab
                 data = result
                 code = 200
 
+            if isinstance(data, PageModel):
+                return {
+                    "status": "success",
+                    "code": code,
+                    "data": json.loads(data.model_dump_json())["items"],
+                    "next_cursor": data.next_cursor
+                }
+
             return {
                 "status": "success",
                 "code": code,